@@ -0,0 +1,20 @@
+import os
+
+import django
+from django.conf import settings
+from django.core.handlers.asgi import ASGIHandler
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+
+
+class CoursesASGIHandler(ASGIHandler):
+    # Requests served over ASGI resolve against ASGI_URLCONF, which adds the streaming routes.
+    def create_request(self, scope, body_file):
+        request, error_response = super().create_request(scope, body_file)
+        if request is not None:
+            request.urlconf = settings.ASGI_URLCONF
+        return request, error_response
+
+
+django.setup(set_prefix=False)
+application = CoursesASGIHandler()
@@ -0,0 +1,78 @@
+from collections import defaultdict
+import bisect
+import threading
+
+
+DURATION_BUCKETS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0
+        self.maximum = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.maximum = max(self.maximum, value)
+
+    def as_dict(self):
+        # Cumulative "less than or equal" counts, the way Prometheus reports histograms.
+        cumulative = 0
+        buckets = {}
+        for bound, count in zip((*map(str, self.buckets), "+Inf"), self.counts):
+            cumulative += count
+            buckets[bound] = cumulative
+        return {"sum": round(self.total, 3), "max": round(self.maximum, 3), "buckets": buckets}
+
+
+class EndpointMetrics:
+    def __init__(self):
+        self.requests = 0
+        self.over_budget = 0
+        self.wall_ms = Histogram(DURATION_BUCKETS)
+        self.db_ms = Histogram(DURATION_BUCKETS)
+        self.queries = Histogram(COUNT_BUCKETS)
+        self.duplicates = Histogram(COUNT_BUCKETS)
+
+    def as_dict(self):
+        return {
+            "requests": self.requests,
+            "over_budget": self.over_budget,
+            "wall_ms": self.wall_ms.as_dict(),
+            "db_ms": self.db_ms.as_dict(),
+            "queries": self.queries.as_dict(),
+            "duplicates": self.duplicates.as_dict(),
+        }
+
+
+class MetricsRegistry:
+    # Per-process aggregates; every worker keeps its own.
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints = defaultdict(EndpointMetrics)
+
+    def record(self, name, wall_ms, db_ms, queries, duplicates, over_budget):
+        with self._lock:
+            metrics = self._endpoints[name]
+            metrics.requests += 1
+            metrics.over_budget += over_budget
+            metrics.wall_ms.observe(wall_ms)
+            metrics.db_ms.observe(db_ms)
+            metrics.queries.observe(queries)
+            metrics.duplicates.observe(duplicates)
+
+    def snapshot(self):
+        with self._lock:
+            return {name: metrics.as_dict() for name, metrics in sorted(self._endpoints.items())}
+
+    def reset(self):
+        with self._lock:
+            self._endpoints.clear()
+
+
+registry = MetricsRegistry()
@@ -0,0 +1,95 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from contextlib import ExitStack, contextmanager
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from .metrics import registry
+import logging
+import time
+
+
+logger = logging.getLogger(__name__)
+
+
+class QueryRecorder:
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements = set()
+        self.duplicates = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+            # The same statement with different parameters is what an N+1 loop looks like.
+            if sql in self.statements:
+                self.duplicates += 1
+            else:
+                self.statements.add(sql)
+
+
+class QueryMetricsMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, "QUERY_METRICS_ENABLED", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.default_budget = getattr(settings, "QUERY_BUDGET_DEFAULT", None)
+        self.budgets = getattr(settings, "QUERY_BUDGETS", {})
+        # Running natively in both modes keeps async views off the sync thread Django would otherwise adapt them through.
+        self.async_mode = iscoroutinefunction(self.get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        recorder = QueryRecorder()
+        started = time.perf_counter()
+        with self.recording(recorder):
+            response = self.get_response(request)
+        return self.process_metrics(request, response, recorder, started)
+
+    async def __acall__(self, request):
+        recorder = QueryRecorder()
+        started = time.perf_counter()
+        with self.recording(recorder):
+            response = await self.get_response(request)
+        return self.process_metrics(request, response, recorder, started)
+
+    @contextmanager
+    def recording(self, recorder):
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            yield
+
+    def process_metrics(self, request, response, recorder, started):
+        wall_ms = (time.perf_counter() - started) * 1000
+        db_ms = recorder.duration * 1000
+
+        match = getattr(request, "resolver_match", None)
+        name = match.view_name if match else "unresolved"
+        budget = self.budgets.get(name, self.default_budget)
+        over_budget = budget is not None and recorder.count > budget
+        if over_budget:
+            logger.warning(
+                "%s made %d queries (%d duplicates), over its budget of %d",
+                name, recorder.count, recorder.duplicates, budget,
+            )
+
+        registry.record(name, wall_ms, db_ms, recorder.count, recorder.duplicates, over_budget)
+        response["Server-Timing"] = ", ".join([
+            f"app;dur={wall_ms:.1f}",
+            f"db;dur={db_ms:.1f}",
+            f'queries;desc="{recorder.count} queries, {recorder.duplicates} duplicates"',
+        ])
+        if over_budget:
+            response["X-Query-Budget-Exceeded"] = f"{recorder.count}/{budget}"
+        return response
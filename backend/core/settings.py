@@ -30,6 +30,7 @@ INSTALLED_APPS = [
 
 
 MIDDLEWARE = [
+    'core.middleware.QueryMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -59,22 +60,68 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'core.wsgi.application'
+ASGI_APPLICATION = 'core.asgi.application'
+ASGI_URLCONF = 'core.asgi_urls'
 
 
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework.authentication.TokenAuthentication",
+        "users.authentication.CachedTokenAuthentication",
     ],
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",
+    ],
+    "DEFAULT_RENDERER_CLASSES": [
+        "courses.fast_serialization.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
     ]
 }
 
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+AUTH_TOKEN_CACHE_TIMEOUT = 300
+
+IMPORT_JOB_LEASE = 300
+
+QUERY_METRICS_ENABLED = False
+QUERY_BUDGET_DEFAULT = 10
+QUERY_BUDGETS = {
+    "my-streams": 4,
+    "stream-topics": 4,
+    "search-stream-topics": 4,
+    "stream-stats": 3,
+    "my-submissions": 4,
+    "my-topics": 4,
+    "received-submissions": 5,
+    "create-submission": 8,
+    "cancel-submission": 6,
+    "create-topic": 7,
+    "create-topics-bulk": 6,
+    "update-topic": 8,
+    "delete-topic": 8,
+    "approve-submission": 8,
+    "reject-submission": 5,
+    "decide-submissions": 10,
+}
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3'
+        'NAME': BASE_DIR / 'db.sqlite3',
+        # Take the write lock when a transaction starts so concurrent writers wait instead of failing with "database is locked".
+        'OPTIONS': {
+            'transaction_mode': 'IMMEDIATE',
+            'timeout': 20,
+        },
+        # A file-backed test database lets concurrent test threads use separate connections.
+        'TEST': {
+            'NAME': BASE_DIR / 'test_db.sqlite3',
+        },
     }
 }
 
@@ -101,6 +148,8 @@ AUTH_PASSWORD_VALIDATORS = [
 
 EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
 
+PASSWORD_SET_URL = "http://localhost:5173/set-password/{uid}/{token}"
+
 
 
 LANGUAGE_CODE = 'en-us'
@@ -113,4 +162,8 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
+MEDIA_URL = 'media/'
+
+MEDIA_ROOT = BASE_DIR / 'media'
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
\ No newline at end of file
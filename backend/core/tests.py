@@ -0,0 +1,71 @@
+from asgiref.sync import iscoroutinefunction
+from django.db import connection
+from django.http import HttpResponse
+from django.test import TestCase, override_settings
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from users.models import User
+from .metrics import registry
+from .middleware import QueryMetricsMiddleware, QueryRecorder
+
+
+@override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"], QUERY_METRICS_ENABLED=True)
+class QueryMetricsMiddlewareTests(TestCase):
+    def setUp(self):
+        registry.reset()
+        self.client = APIClient()
+        self.student = User.objects.create_user(email="student@test.com", password="password123", first_name="Student", last_name="One", role='STUDENT')
+        self.admin = User.objects.create_superuser(email="admin@test.com", password="password123", username="admin")
+        self.client.force_authenticate(user=self.student)
+
+    def test_server_timing_reports_queries(self):
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/courses/streams/my/')
+        self.assertRegex(response["Server-Timing"], r'^app;dur=[\d.]+, db;dur=[\d.]+, queries;desc="1 queries, 0 duplicates"$')
+        self.assertNotIn("X-Query-Budget-Exceeded", response)
+
+    async def test_async_views_are_measured_without_a_sync_adapter(self):
+        async def get_response(request):
+            return HttpResponse()
+
+        self.assertTrue(iscoroutinefunction(QueryMetricsMiddleware(get_response)))
+        token = await Token.objects.acreate(user=self.student)
+        response = await self.async_client.get('/api/courses/async/streams/my/', headers={"Authorization": f"Token {token.key}"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertRegex(response["Server-Timing"], r'queries;desc="\d+ queries, 0 duplicates"$')
+        self.assertEqual(registry.snapshot()["async-my-streams"]["requests"], 1)
+
+    @override_settings(QUERY_METRICS_ENABLED=False)
+    def test_can_be_switched_off(self):
+        self.assertNotIn("Server-Timing", self.client.get('/api/courses/streams/my/'))
+
+    def test_metrics_are_aggregated_per_url_name(self):
+        self.client.get('/api/courses/streams/my/')
+        self.client.get('/api/courses/streams/my/')
+        self.client.force_authenticate(user=self.admin)
+
+        metrics = self.client.get('/api/metrics/queries/').json()
+
+        self.assertEqual(metrics["my-streams"]["requests"], 2)
+        self.assertEqual(metrics["my-streams"]["queries"]["sum"], 2)
+        self.assertEqual(metrics["my-streams"]["queries"]["buckets"]["1"], 2)
+        self.assertEqual(metrics["my-streams"]["wall_ms"]["buckets"]["+Inf"], 2)
+
+    def test_metrics_endpoint_is_admin_only(self):
+        self.assertEqual(self.client.get('/api/metrics/queries/').status_code, status.HTTP_403_FORBIDDEN)
+
+    @override_settings(QUERY_BUDGETS={"my-streams": 0})
+    def test_requests_over_budget_are_flagged(self):
+        with self.assertLogs("core.middleware", "WARNING"):
+            response = self.client.get('/api/courses/streams/my/')
+        self.assertEqual(response["X-Query-Budget-Exceeded"], "1/0")
+        self.assertEqual(registry.snapshot()["my-streams"]["over_budget"], 1)
+
+    def test_repeated_statements_count_as_duplicates(self):
+        recorder = QueryRecorder()
+        with connection.execute_wrapper(recorder):
+            for user_id in (self.student.id, self.admin.id, self.student.id):
+                User.objects.filter(id=user_id).exists()
+            User.objects.count()
+        self.assertEqual((recorder.count, recorder.duplicates), (4, 2))
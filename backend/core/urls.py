@@ -1,11 +1,13 @@
 from django.contrib import admin
 from django.urls import path, include
 from users.views import UserDetailsView
+from .views import query_metrics
 
 
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/auth/user/", UserDetailsView.as_view(), name="rest_user_details"),
     path("api/auth/", include("dj_rest_auth.urls")),
-    path("api/courses/", include("courses.urls"))
+    path("api/courses/", include("courses.urls")),
+    path("api/metrics/queries/", query_metrics, name="query-metrics")
 ]
\ No newline at end of file
@@ -0,0 +1,12 @@
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from .metrics import registry
+
+
+@api_view(["GET", "DELETE"])
+@permission_classes([IsAdminUser])
+def query_metrics(request):
+    if request.method == "DELETE":
+        registry.reset()
+    return Response(registry.snapshot())
@@ -1,16 +1,21 @@
-from .models import Specialty, CourseStream, Topic, TopicSubmission
+from .models import Specialty, CourseStream, Topic, TopicSubmission, OutboxEmail, ImportJob, StreamStats
+from .importers import create_topics, read_topic_rows
+from .membership import Membership, is_member
+from .pagination import EstimatedCountPaginator
+from .search import get_search_backend
+from .serializers import TopicBulkItemSerializer
 from users.models import User
+from django import forms
 from django.contrib import admin
+from django.db.models import Exists, OuterRef, Q
+from django.utils.text import smart_split, unescape_string_literal
+from django.contrib.admin import helpers
 from django.urls import path, reverse
 from django.utils.html import format_html
-from django.shortcuts import render, redirect
+from django.http import JsonResponse
+from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
-from django.core.mail import send_mail
-from django.conf import settings
 from django.db import transaction
-from django.utils.crypto import get_random_string
-import csv
-import io
 
 
 @admin.register(Specialty)
@@ -19,17 +24,79 @@ class SpecialtyAdmin(admin.ModelAdmin):
     search_fields = ('name', 'code')
 
 
+class TopicImportForm(forms.Form):
+    stream = forms.ModelChoiceField(queryset=CourseStream.objects.order_by("name"))
+    teacher = forms.ModelChoiceField(queryset=User.objects.filter(role=User.Role.TEACHER).order_by("last_name", "first_name"))
+    file = forms.FileField(help_text="A .csv file with title and description columns, or a .json list of objects with the same keys.")
+
+
 @admin.register(Topic)
 class TopicAdmin(admin.ModelAdmin):
     list_display = ('title', 'teacher', 'stream', 'status')
     list_filter = ('status', 'stream', 'teacher')
+    list_select_related = ('teacher', 'stream')
     search_fields = ('title', 'description')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_search_results(self, request, queryset, search_term):
+        # Served by the topic search index instead of icontains over every row.
+        if not search_term:
+            return queryset, False
+        return get_search_backend().filter(queryset, search_term), False
+
+    def get_urls(self):
+        urls = super().get_urls()
+        custom_urls = [
+            path(
+                "import/",
+                self.admin_site.admin_view(self.import_topics_view),
+                name="courses_topic_import",
+            ),
+        ]
+        return custom_urls + urls
+
+    def import_topics_view(self, request):
+        form = TopicImportForm(request.POST or None, request.FILES or None)
+        if request.method == "POST" and form.is_valid():
+            stream, teacher, file = form.cleaned_data["stream"], form.cleaned_data["teacher"], form.cleaned_data["file"]
+            if not file.name.endswith((".csv", ".json")):
+                form.add_error("file", "Please upload a valid .csv or .json file")
+            elif not is_member(teacher, stream):
+                form.add_error("teacher", "This teacher is not assigned to the selected stream")
+            else:
+                try:
+                    rows = read_topic_rows(file)
+                except ValueError as e:
+                    rows = None
+                    form.add_error("file", f"Error reading file: {e}")
+
+                if rows is not None:
+                    serializer = TopicBulkItemSerializer(data=rows, many=True, allow_empty=False)
+                    if serializer.is_valid():
+                        with transaction.atomic():
+                            topics = create_topics(teacher, stream, serializer.validated_data)
+                        self.message_user(request, f"Imported {len(topics)} topics into {stream.name}", messages.SUCCESS)
+                        return redirect(reverse("admin:courses_topic_changelist"))
+
+                    errors = serializer.errors if isinstance(serializer.errors, list) else [serializer.errors]
+                    for row_number, row_errors in enumerate(errors, start=1):
+                        for field_name, field_errors in row_errors.items():
+                            form.add_error(None, f"Row {row_number}, {field_name}: {' '.join(field_errors)}")
+
+        context = self.admin_site.each_context(request)
+        context["opts"] = self.model._meta
+        context["form"] = form
+        return render(request, "admin/import_topics_form.html", context)
 
 
 @admin.register(TopicSubmission)
 class TopicSubmissionAdmin(admin.ModelAdmin):
     list_display = ('topic', 'student', 'status', 'created_at')
     list_filter = ('status',)
+    list_select_related = ('topic', 'student')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     autocomplete_fields = ('topic', 'student')
     readonly_fields = ('created_at',)
     fieldsets = (
@@ -39,6 +106,47 @@ class TopicSubmissionAdmin(admin.ModelAdmin):
     )
 
 
+@admin.register(StreamStats)
+class StreamStatsAdmin(admin.ModelAdmin):
+    list_display = ('stream', 'available_topics', 'taken_topics', 'pending_submissions', 'approved_submissions', 'rejected_submissions')
+    list_select_related = ('stream',)
+    search_fields = ('stream__name',)
+    readonly_fields = list_display
+
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(OutboxEmail)
+class OutboxEmailAdmin(admin.ModelAdmin):
+    list_display = ('recipient', 'subject', 'status', 'attempts', 'created_at', 'sent_at')
+    list_filter = ('status',)
+    search_fields = ('recipient',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    exclude = ('body',)
+    readonly_fields = ('recipient', 'subject', 'status', 'attempts', 'last_error', 'created_at', 'sent_at')
+    actions = ["retry_emails"]
+
+    @admin.action(description="Retry selected failed emails")
+    def retry_emails(self, request, queryset):
+        updated_count = queryset.filter(status=OutboxEmail.EmailStatus.FAILED).update(
+            status=OutboxEmail.EmailStatus.PENDING, attempts=0
+        )
+        self.message_user(request, f"{updated_count} emails have been queued for retry", messages.SUCCESS)
+
+
+@admin.register(ImportJob)
+class ImportJobAdmin(admin.ModelAdmin):
+    list_display = ('stream', 'status', 'rows_processed', 'rows_created', 'rows_added', 'rows_skipped', 'created_at', 'finished_at')
+    list_filter = ('status',)
+    list_select_related = ('stream',)
+    readonly_fields = ('stream', 'file', 'status', 'rows_processed', 'rows_created', 'rows_added', 'rows_skipped', 'errors', 'created_by', 'created_at', 'started_at', 'finished_at')
+
+    def has_add_permission(self, request):
+        return False
+
+
 @admin.register(CourseStream)
 class CourseStreamAdmin(admin.ModelAdmin):
     list_display = (
@@ -51,9 +159,22 @@ class CourseStreamAdmin(admin.ModelAdmin):
         "import_users_link",
     )
     list_filter = ("is_active", "specialty", "academic_year", "semester")
+    list_select_related = ("specialty",)
     search_fields = ("name", "users__email", "users__first_name", "users__last_name")
     autocomplete_fields = ("users",)
-    actions = ["deactivate_streams"]
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    actions = ["deactivate_streams", "import_participants_for_streams"]
+
+    def get_search_results(self, request, queryset, search_term):
+        # Members are matched with EXISTS rather than a join, which repeats each stream once per member and needs DISTINCT.
+        members = Membership.objects.filter(coursestream_id=OuterRef("pk"))
+        for term in smart_split(search_term):
+            if term.startswith(('"', "'")) and term[0] == term[-1]:
+                term = unescape_string_literal(term)
+            member_matches = Q(user__email__icontains=term) | Q(user__first_name__icontains=term) | Q(user__last_name__icontains=term)
+            queryset = queryset.filter(Q(name__icontains=term) | Exists(members.filter(member_matches)))
+        return queryset, False
 
     def get_urls(self):
         urls = super().get_urls()
@@ -63,6 +184,11 @@ class CourseStreamAdmin(admin.ModelAdmin):
                 self.admin_site.admin_view(self.import_users_view),
                 name="courses_coursestream_import_users",
             ),
+            path(
+                "<path:object_id>/import/jobs/<int:job_id>/",
+                self.admin_site.admin_view(self.import_job_status_view),
+                name="courses_coursestream_import_job_status",
+            ),
         ]
         return custom_urls + urls
 
@@ -81,6 +207,37 @@ class CourseStreamAdmin(admin.ModelAdmin):
             messages.SUCCESS,
         )
 
+    @admin.action(description="Import participants for selected streams")
+    def import_participants_for_streams(self, request, queryset):
+        streams = list(queryset.order_by("name"))
+
+        if "apply" in request.POST:
+            uploads = [(stream, request.FILES.get(f"file_{stream.pk}")) for stream in streams]
+            uploads = [(stream, file) for stream, file in uploads if file is not None]
+            for stream, file in uploads:
+                if not file.name.endswith(".csv"):
+                    self.message_user(request, f"Please upload a valid .csv file for {stream.name}", messages.ERROR)
+                    return None
+
+            if not uploads:
+                self.message_user(request, "No files were uploaded", messages.WARNING)
+                return None
+
+            jobs = [ImportJob.objects.create(stream=stream, file=file, created_by=request.user) for stream, file in uploads]
+            self.message_user(
+                request,
+                f"Queued {len(jobs)} import jobs: " + ", ".join(f"#{job.pk}" for job in jobs),
+                messages.INFO,
+            )
+            return redirect("admin:courses_importjob_changelist")
+
+        context = self.admin_site.each_context(request)
+        context["opts"] = self.model._meta
+        context["streams"] = streams
+        context["action_checkbox_name"] = helpers.ACTION_CHECKBOX_NAME
+
+        return render(request, "admin/import_users_multi_form.html", context)
+
     def import_users_view(self, request, object_id):
         stream = self.get_object(request, object_id)
         changelist_url = reverse("admin:courses_coursestream_changelist")
@@ -91,67 +248,31 @@ class CourseStreamAdmin(admin.ModelAdmin):
                 self.message_user(request, "Please upload a valid .csv file", messages.ERROR)
                 return redirect(changelist_url)
 
-            try:
-                self.import_users_from_csv(request, stream, file)
-            except Exception as e:
-                self.message_user(request, f"Error processing file: {e}", messages.ERROR)
-                return redirect(changelist_url)
-
-            return redirect(changelist_url)
+            job = ImportJob.objects.create(stream=stream, file=file, created_by=request.user)
+            self.message_user(request, f"Import job #{job.pk} has been queued", messages.INFO)
+            import_url = reverse("admin:courses_coursestream_import_users", args=[stream.pk])
+            return redirect(f"{import_url}?job={job.pk}")
 
         context = self.admin_site.each_context(request)
         context["opts"] = self.model._meta
         context["stream"] = stream
 
+        job_id = request.GET.get("job")
+        if job_id and job_id.isdigit():
+            context["job"] = ImportJob.objects.filter(pk=job_id, stream=stream).first()
+            if context["job"] is not None:
+                context["job_status_url"] = reverse("admin:courses_coursestream_import_job_status", args=[stream.pk, job_id])
+
         return render(request, "admin/import_users_form.html", context)
 
-    @transaction.atomic
-    def import_users_from_csv(self, request, stream, file):
-        decoded_file = file.read().decode("utf-8")
-        io_string = io.StringIO(decoded_file)
-        reader = csv.DictReader(io_string)
-        
-        imported_count = 0
-        for row in reader:
-            email = row.get("email")
-            if not email:
-                continue
-
-            defaults = {
-                "first_name": row.get("first_name", ""),
-                "last_name": row.get("last_name", ""),
-                "middle_name": row.get("middle_name", ""),
-                "role": row.get("role", "").upper()
-            }
-            
-            if not User.objects.filter(email=email).exists():
-                 if not all([defaults["first_name"], defaults["last_name"], defaults["middle_name"], defaults["role"]]):
-                    self.message_user(request, f"Skipping user {email}: missing required fields (first_name, last_name, middle_name, role)", messages.WARNING)
-                    continue
-
-            user, created = User.objects.get_or_create(email=email, defaults=defaults)
-
-            if created:
-                password = get_random_string(12)
-                user.set_password(password)
-                user.save()
-                
-                try:
-                    send_mail(
-                        "Account created for 'eKafedra'",
-                        f"Your account has been created\nLogin: {user.email}\nPassword: {password}",
-                        settings.DEFAULT_FROM_EMAIL,
-                        [user.email],
-                        fail_silently=False,
-                    )
-                except Exception as e:
-                    print(f"Failed to send email to {user.email}: {e}")
-
-            if user not in stream.users.all():
-                stream.users.add(user)
-                imported_count += 1
-        
-        if imported_count > 0:
-            self.message_user(request, f"Successfully processed file. Added {imported_count} new participants to the stream", messages.SUCCESS)
-        else:
-            self.message_user(request, "File processed. No new participants were added to the stream (they might be already in it)", messages.INFO)
\ No newline at end of file
+    def import_job_status_view(self, request, object_id, job_id):
+        job = get_object_or_404(ImportJob, pk=job_id, stream_id=object_id)
+        return JsonResponse({
+            "id": job.pk,
+            "status": job.status,
+            "rows_processed": job.rows_processed,
+            "rows_created": job.rows_created,
+            "rows_added": job.rows_added,
+            "rows_skipped": job.rows_skipped,
+            "errors": job.errors,
+        })
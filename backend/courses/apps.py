@@ -1,6 +1,11 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class CoursesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'courses'
\ No newline at end of file
+    name = 'courses'
+
+    def ready(self):
+        from . import signals
+        post_migrate.connect(signals.restore_search_index, sender=self)
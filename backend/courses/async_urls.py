@@ -0,0 +1,11 @@
+from django.urls import path
+from . import async_views
+
+
+urlpatterns = [
+    path("streams/my/", async_views.get_my_streams, name="async-my-streams"),
+    path("streams/<int:stream_id>/topics/", async_views.get_stream_topics, name="async-stream-topics"),
+    path("topics/my/", async_views.get_my_topics, name="async-my-topics"),
+    path("submissions/my/", async_views.get_my_submissions, name="async-my-submissions"),
+    path("submissions/received/", async_views.get_received_submissions, name="async-received-submissions")
+]
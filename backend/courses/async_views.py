@@ -0,0 +1,159 @@
+from asgiref.sync import sync_to_async
+from django.core import signing
+from django.http import HttpResponse, StreamingHttpResponse
+from rest_framework import exceptions
+from users.authentication import CachedTokenAuthentication
+from users.models import User
+from . import queries
+from .caching import acached_stream_topics_response
+from .events import broker, format_event, read_ticket
+from .fast_serialization import FastJSONRenderer
+from .membership import ais_member
+from .models import CourseStream
+from .pagination import apaginated_data
+from .serializers import MyStreamSerializer, TopicSerializer, TopicSubmissionSerializer, TopicWithSubmissionsSerializer
+import asyncio
+import functools
+
+
+KEEPALIVE_INTERVAL = 15
+RETRY_INTERVAL = 5000
+
+
+def json_response(data, status=200):
+    return HttpResponse(FastJSONRenderer().render(data), content_type="application/json", status=status)
+
+
+def error_response(exception):
+    response = json_response({"detail": exception.detail}, exception.status_code)
+    if exception.status_code == 401:
+        response["WWW-Authenticate"] = CachedTokenAuthentication().authenticate_header(None)
+    return response
+
+
+async def authenticate_token(request):
+    header = request.headers.get("Authorization", "").split()
+    key = header[1] if len(header) == 2 and header[0] == "Token" else None
+    if not key:
+        raise exceptions.NotAuthenticated()
+
+    user, _ = await sync_to_async(CachedTokenAuthentication().authenticate_credentials)(key)
+    return user
+
+
+async def authenticate_ticket(request, stream_id):
+    # EventSource cannot send headers, so the event stream takes a short-lived signed ticket from the query string.
+    ticket = request.GET.get("ticket")
+    if not ticket:
+        raise exceptions.NotAuthenticated()
+    try:
+        user_id = read_ticket(ticket, stream_id)
+    except signing.BadSignature:
+        raise exceptions.AuthenticationFailed("Invalid or expired ticket.")
+
+    user = await User.objects.filter(pk=user_id, is_active=True).afirst()
+    if user is None:
+        raise exceptions.AuthenticationFailed("User inactive or deleted.")
+    return user
+
+
+def async_read_view(role=None, ticket_auth=False):
+    # Async counterpart of @api_view(["GET"]) with token (or event stream ticket) authentication and a role check.
+    def decorator(view):
+        @functools.wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            try:
+                if request.method != "GET":
+                    raise exceptions.MethodNotAllowed(request.method)
+                if ticket_auth:
+                    request.user = await authenticate_ticket(request, kwargs["stream_id"])
+                else:
+                    request.user = await authenticate_token(request)
+                if role is not None and request.user.role != role:
+                    raise exceptions.PermissionDenied()
+                return await view(request, *args, **kwargs)
+            except exceptions.APIException as error:
+                return error_response(error)
+        return wrapper
+    return decorator
+
+
+def is_active_param(request):
+    return request.GET.get('is_active', 'true').lower() == 'true'
+
+
+async def check_stream_access(user, stream_id):
+    if not await ais_member(user, stream_id):
+        if not await CourseStream.objects.filter(id=stream_id).aexists():
+            raise exceptions.NotFound("No CourseStream matches the given query.")
+        raise exceptions.PermissionDenied("Not authorized to view topics for this stream.")
+
+
+@async_read_view()
+async def get_my_streams(request):
+    streams = queries.my_streams(request.user, is_active_param(request))
+    return json_response(await apaginated_data(request, streams, MyStreamSerializer, ('id',)))
+
+
+@async_read_view(role=User.Role.STUDENT)
+async def get_stream_topics(request, stream_id):
+    await check_stream_access(request.user, stream_id)
+
+    async def render_topics():
+        return await apaginated_data(request, queries.available_topics(stream_id), TopicSerializer, ('id',))
+
+    return await acached_stream_topics_response(request, stream_id, render_topics)
+
+
+@async_read_view(role=User.Role.STUDENT)
+async def get_my_submissions(request):
+    submissions = queries.my_submissions(request.user)
+    return json_response(await apaginated_data(request, submissions, TopicSubmissionSerializer, ('-created_at', '-id')))
+
+
+@async_read_view(role=User.Role.TEACHER)
+async def get_my_topics(request):
+    topics = queries.my_topics(request.user, is_active_param(request))
+    return json_response(await apaginated_data(request, topics, TopicSerializer, ('id',)))
+
+
+@async_read_view(role=User.Role.TEACHER)
+async def get_received_submissions(request):
+    topics = queries.received_submissions(request.user)
+    return json_response(await apaginated_data(request, topics, TopicWithSubmissionsSerializer, ('-latest_submission_date', '-id')))
+
+
+class TopicEventStream:
+    # Response.close() unsubscribes even when the server never finalizes the generator.
+
+    def __init__(self, stream_id):
+        self.stream_id = stream_id
+        self.queue = None
+
+    async def __aiter__(self):
+        self.queue = broker.subscribe(self.stream_id)
+        try:
+            yield f"retry: {RETRY_INTERVAL}\n\n"
+            while True:
+                try:
+                    event = await asyncio.wait_for(self.queue.get(), KEEPALIVE_INTERVAL)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield format_event(event)
+        finally:
+            self.close()
+
+    def close(self):
+        if self.queue is not None:
+            broker.unsubscribe(self.stream_id, self.queue)
+
+
+@async_read_view(role=User.Role.STUDENT, ticket_auth=True)
+async def stream_topic_events(request, stream_id):
+    await check_stream_access(request.user, stream_id)
+
+    response = StreamingHttpResponse(TopicEventStream(stream_id), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
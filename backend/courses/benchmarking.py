@@ -0,0 +1,78 @@
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+import math
+import time
+import urllib.error
+import urllib.request
+
+
+def percentile(values, percent):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, math.ceil(percent / 100 * len(ordered)) - 1)
+    return ordered[index]
+
+
+def time_calls(func, arguments):
+    timings = []
+    for argument in arguments:
+        started = time.perf_counter()
+        func(argument)
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def count_queries(func, *args, **kwargs):
+    with CaptureQueriesContext(connection) as context:
+        result = func(*args, **kwargs)
+    return result, len(context.captured_queries)
+
+
+def format_timings(timings):
+    return (
+        f"avg {sum(timings) / len(timings):.3f} ms, "
+        f"p50 {percentile(timings, 50):.3f} ms, "
+        f"p99 {percentile(timings, 99):.3f} ms"
+    )
+
+
+@dataclass
+class LoadResult:
+    timings: list = field(default_factory=list)
+    errors: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def requests_per_second(self):
+        return len(self.timings) / self.elapsed if self.elapsed else 0.0
+
+
+def fetch(url, headers):
+    request = urllib.request.Request(url, headers=headers)
+    started = time.perf_counter()
+    with urllib.request.urlopen(request, timeout=30) as response:
+        response.read()
+    return (time.perf_counter() - started) * 1000
+
+
+def run_load(requests, concurrency):
+    result = LoadResult()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = [pool.submit(fetch, url, headers) for url, headers in requests]
+        for future in futures:
+            try:
+                result.timings.append(future.result())
+            except (urllib.error.URLError, OSError):
+                result.errors += 1
+    result.elapsed = time.perf_counter() - started
+    return result
+
+
+def format_load(result):
+    if not result.timings:
+        return f"all {result.errors} requests failed"
+    return f"{result.requests_per_second:.1f} req/s, {format_timings(result.timings)}, {result.errors} errors"
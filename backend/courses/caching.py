@@ -0,0 +1,72 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.http import parse_etags
+from .fast_serialization import FastJSONRenderer
+import hashlib
+import time
+
+
+RESPONSE_TIMEOUT = 600
+
+
+def _version_key(stream_id):
+    return f"courses:stream-topics-version:{stream_id}"
+
+
+def get_stream_version(stream_id):
+    return cache.get_or_set(_version_key(stream_id), time.time_ns, None)
+
+
+def _bump(stream_id):
+    key = _version_key(stream_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), None)
+
+
+def bump_stream_version(stream_id):
+    # Bump again after commit so a reader that cached the pre-commit rows under the new version is discarded.
+    _bump(stream_id)
+    transaction.on_commit(lambda: _bump(stream_id))
+
+
+def _response_key(request, stream_id, version):
+    variant = hashlib.md5(f"{request.get_host()}?{sorted(request.GET.lists())}".encode("utf-8")).hexdigest()
+    return f"courses:stream-topics:{stream_id}:{version}:{variant}"
+
+
+def _render(data):
+    body = FastJSONRenderer().render(data)
+    return (f'"{hashlib.md5(body).hexdigest()}"', body)
+
+
+def _conditional_response(request, cached):
+    etag, body = cached
+    if etag in parse_etags(request.headers.get("If-None-Match", "")):
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(body, content_type="application/json")
+    response["ETag"] = etag
+    response["Cache-Control"] = "private, no-cache"
+    return response
+
+
+def cached_stream_topics_response(request, stream_id, render_data):
+    key = _response_key(request, stream_id, get_stream_version(stream_id))
+    cached = cache.get(key)
+    if cached is None:
+        cached = _render(render_data())
+        cache.set(key, cached, RESPONSE_TIMEOUT)
+    return _conditional_response(request, cached)
+
+
+async def acached_stream_topics_response(request, stream_id, render_data):
+    version = await cache.aget_or_set(_version_key(stream_id), time.time_ns, None)
+    key = _response_key(request, stream_id, version)
+    cached = await cache.aget(key)
+    if cached is None:
+        cached = _render(await render_data())
+        await cache.aset(key, cached, RESPONSE_TIMEOUT)
+    return _conditional_response(request, cached)
@@ -0,0 +1,9 @@
+from django.urls import path
+from . import async_views, views
+
+
+# Only the ASGI application routes these: an open event stream would pin a WSGI worker thread for its whole lifetime.
+urlpatterns = [
+    path("streams/<int:stream_id>/events/ticket/", views.issue_stream_events_ticket, name="stream-events-ticket"),
+    path("streams/<int:stream_id>/events/", async_views.stream_topic_events, name="stream-events"),
+]
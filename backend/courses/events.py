@@ -0,0 +1,80 @@
+from collections import defaultdict
+from django.core import signing
+from django.db import transaction
+import asyncio
+import json
+import threading
+
+
+QUEUE_SIZE = 100
+TICKET_MAX_AGE = 60
+TICKET_SALT = "courses.events.ticket"
+
+
+class TopicEventBroker:
+    # In-process stand-in for a message broker: events only reach subscribers served by this process.
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = defaultdict(set)
+
+    def subscribe(self, stream_id):
+        subscriber = (asyncio.get_running_loop(), asyncio.Queue(QUEUE_SIZE))
+        with self._lock:
+            self._subscribers[stream_id].add(subscriber)
+        return subscriber[1]
+
+    def unsubscribe(self, stream_id, queue):
+        with self._lock:
+            subscribers = self._subscribers.get(stream_id, set())
+            subscribers.difference_update({item for item in subscribers if item[1] is queue})
+            if not subscribers:
+                self._subscribers.pop(stream_id, None)
+
+    def has_subscribers(self, stream_id):
+        return stream_id in self._subscribers
+
+    def publish(self, stream_id, event):
+        with self._lock:
+            subscribers = list(self._subscribers.get(stream_id, ()))
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(_deliver, queue, event)
+            except RuntimeError:
+                self.unsubscribe(stream_id, queue)
+
+
+def _deliver(queue, event):
+    try:
+        queue.put_nowait(event)
+    except asyncio.QueueFull:
+        # A client that fell behind gets a single resync instead of a partial history.
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait({"type": "resync", "data": {}})
+
+
+broker = TopicEventBroker()
+
+
+def publish_topic_event(stream_id, event_type, data):
+    if not broker.has_subscribers(stream_id):
+        return
+    event = {"type": event_type, "data": data}
+    transaction.on_commit(lambda: broker.publish(stream_id, event))
+
+
+def format_event(event):
+    return f"event: {event['type']}\ndata: {json.dumps(event['data'], default=str)}\n\n"
+
+
+def issue_ticket(user, stream_id):
+    return signing.dumps({"user": user.pk, "stream": stream_id}, salt=TICKET_SALT)
+
+
+def read_ticket(ticket, stream_id):
+    # Raises signing.BadSignature for tampered, expired or other-stream tickets.
+    data = signing.loads(ticket, salt=TICKET_SALT, max_age=TICKET_MAX_AGE)
+    if data["stream"] != stream_id:
+        raise signing.BadSignature("The ticket was issued for another stream.")
+    return data["user"]
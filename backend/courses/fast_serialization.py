@@ -0,0 +1,93 @@
+from functools import lru_cache
+from django.db import models
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _get_source(source_attrs):
+    def get(instance):
+        for attr in source_attrs:
+            if instance is None:
+                return None
+            instance = getattr(instance, attr)
+        return instance
+    return get
+
+
+def _iterate(value):
+    return value.all() if isinstance(value, models.manager.BaseManager) else value
+
+
+def _compile_value(field):
+    if isinstance(field, serializers.ListSerializer):
+        extract_child = _compile_fields(field.child.fields)
+        return lambda value: [extract_child(item) for item in _iterate(value)]
+    if isinstance(field, serializers.BaseSerializer):
+        return _compile_fields(field.fields)
+    if isinstance(field, serializers.ManyRelatedField):
+        return lambda value: [item.pk for item in _iterate(value)]
+    # Values that already have their JSON type come back unchanged from these fields, so only others go through them.
+    to_representation = field.to_representation
+    if isinstance(field, serializers.ChoiceField) and not isinstance(field, serializers.MultipleChoiceField):
+        choices = field.choice_strings_to_values
+        return lambda value: value if type(value) is str and value in choices else to_representation(value)
+    if isinstance(field, serializers.CharField):
+        return lambda value: value if type(value) is str else to_representation(value)
+    if isinstance(field, serializers.IntegerField):
+        return lambda value: value if type(value) is int else to_representation(value)
+    if isinstance(field, serializers.BooleanField):
+        return lambda value: value if type(value) is bool else to_representation(value)
+    return to_representation
+
+
+def _compile_field(field):
+    if isinstance(field, serializers.PrimaryKeyRelatedField):
+        # Read the foreign key column, like DRF's pk-only optimization, so the related row is never loaded.
+        get_parent = _get_source(field.source_attrs[:-1])
+        attr = field.source_attrs[-1]
+        return lambda instance: None if (parent := get_parent(instance)) is None else parent.serializable_value(attr)
+    get = _get_source(field.source_attrs)
+    convert = _compile_value(field)
+    return lambda instance: None if (value := get(instance)) is None else convert(value)
+
+
+def _compile_fields(fields):
+    extractors = tuple(
+        (name, _compile_field(field))
+        for name, field in fields.items()
+        if not field.write_only
+    )
+
+    def extract(instance):
+        return {name: extract_field(instance) for name, extract_field in extractors}
+    return extract
+
+
+@lru_cache(maxsize=256)
+def compile_serializer(serializer_class, fieldset=None):
+    # Read-only shortcut for serializer_class(instance).data that skips the per-object field machinery.
+    serializer = serializer_class() if fieldset is None else serializer_class(fieldset=fieldset)
+    return _compile_fields(serializer.fields)
+
+
+def serialize_many(serializer_class, instances, fieldset=None):
+    extract = compile_serializer(serializer_class, fieldset)
+    return [extract(instance) for instance in instances]
+
+
+class FastJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None or self.ensure_ascii or not self.compact or self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            body = orjson.dumps(data)
+        except TypeError:
+            # Lazy strings, decimals and the like still go through the DRF encoder.
+            return super().render(data, accepted_media_type, renderer_context)
+        # Keep the same escaping of line separators as JSONRenderer.
+        return body.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
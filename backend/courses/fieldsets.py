@@ -0,0 +1,89 @@
+from rest_framework import serializers
+
+
+PK_ONLY = "pk"
+
+
+def _split(value):
+    return {item.strip() for item in value.split(",") if item.strip()} if value else set()
+
+
+def _subpaths(paths, name):
+    prefix = f"{name}."
+    return {path[len(prefix):] for path in paths if path.startswith(prefix)}
+
+
+def _nested(field):
+    field = field.child if isinstance(field, serializers.ListSerializer) else field
+    return field if isinstance(field, serializers.BaseSerializer) else None
+
+
+def build_fieldset(serializer, fields=None, expand=frozenset()):
+    # None keeps every field fully nested; otherwise a tuple of (name, subset) where a nested subset
+    # is PK_ONLY, None or another such tuple.
+    if fields is None and not expand:
+        return None
+
+    selected = []
+    for name, field in serializer.fields.items():
+        sub_fields = _subpaths(fields or (), name)
+        if fields is not None and name not in fields and not sub_fields:
+            continue
+        nested = _nested(field)
+        if nested is None:
+            selected.append((name, None))
+        elif name in expand or sub_fields or _subpaths(expand, name):
+            selected.append((name, build_fieldset(nested, sub_fields or None, _subpaths(expand, name))))
+        else:
+            selected.append((name, PK_ONLY))
+    return tuple(selected)
+
+
+def fieldset_from_request(request, serializer_class):
+    params = getattr(request, "query_params", request.GET)
+    fields = _split(params.get("fields"))
+    return build_fieldset(serializer_class(), fields or None, frozenset(_split(params.get("expand"))))
+
+
+def _collect_columns(serializer, prefix, columns, related):
+    concrete = {field.name for field in serializer.Meta.model._meta.concrete_fields}
+    for field in serializer.fields.values():
+        if isinstance(field, (serializers.ListSerializer, serializers.ManyRelatedField)):
+            continue
+        attr = field.source_attrs[0] if field.source_attrs else None
+        if attr not in concrete:
+            return False
+        columns.add(prefix + attr)
+        if isinstance(field, serializers.BaseSerializer):
+            related.add(prefix + attr)
+            if not _collect_columns(field, f"{prefix}{attr}__", columns, related):
+                return False
+    return True
+
+
+def narrow_queryset(queryset, serializer_class, fieldset, keep=()):
+    if fieldset is None:
+        return queryset
+
+    serializer = serializer_class(fieldset=fieldset)
+    many_fields = {
+        field.source for field in serializer.fields.values()
+        if isinstance(field, (serializers.ListSerializer, serializers.ManyRelatedField))
+    }
+    lookups = [
+        lookup for lookup in queryset._prefetch_related_lookups
+        if getattr(lookup, "prefetch_to", lookup).split("__")[0] in many_fields
+    ]
+    queryset = queryset.prefetch_related(None).prefetch_related(*lookups)
+
+    columns, related = set(), set()
+    if not _collect_columns(serializer, "", columns, related):
+        # A field reads a property rather than a column, so the columns and joins stay as they are.
+        return queryset
+
+    concrete = {field.name for field in queryset.model._meta.concrete_fields}
+    columns.update(name for name in keep if name in concrete)
+    queryset = queryset.select_related(None)
+    if related:
+        queryset = queryset.select_related(*related)
+    return queryset.only(*columns)
@@ -0,0 +1,209 @@
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from itertools import islice
+from django.contrib.auth.hashers import make_password
+from django.db import IntegrityError, transaction
+from users.models import User
+from .caching import bump_stream_version
+from .events import publish_topic_event
+from .fast_serialization import serialize_many
+from .mail import queue_account_emails
+from .membership import Membership, invalidate as invalidate_memberships
+from .models import Topic
+from .serializers import TopicSerializer
+from .stats import adjust_stream_stats
+import codecs
+import csv
+import json
+import re
+
+
+BATCH_SIZE = 1000
+CREATE_USER_ATTEMPTS = 3
+REQUIRED_FIELDS = ("first_name", "last_name", "middle_name", "role")
+# csv only treats \r, \n and \r\n as line breaks; str.splitlines() would also split on \x0c, \x85, U+2028 and friends.
+LINE_BREAK = re.compile(r"(?<=\n)|(?<=\r)(?=[^\n])")
+
+
+@dataclass
+class ImportResult:
+    created_count: int = 0
+    processed_count: int = 0
+    skipped_count: int = 0
+    added_count: int = 0
+    warnings: list = field(default_factory=list)
+
+
+def chunked(items, size=BATCH_SIZE):
+    items = list(items)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def iter_lines(file, encoding="utf-8", chunk_size=None):
+    decoder = codecs.getincrementaldecoder(encoding)()
+    pending = ""
+    for chunk in file.chunks(chunk_size):
+        lines = LINE_BREAK.split(pending + decoder.decode(chunk))
+        pending = lines.pop()
+        yield from lines
+
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield from LINE_BREAK.split(pending)
+
+
+def read_csv_rows(file, chunk_size=None):
+    return csv.DictReader(iter_lines(file, chunk_size=chunk_size))
+
+
+def read_topic_rows(file):
+    if file.name.endswith(".json"):
+        rows = json.loads(file.read().decode("utf-8"))
+        if not isinstance(rows, list):
+            raise ValueError("The JSON file must contain a list of topics.")
+        return rows
+    return list(read_csv_rows(file))
+
+
+def parse_rows(rows):
+    for row in rows:
+        email = row.get("email")
+        if not email:
+            continue
+
+        defaults = {
+            "first_name": row.get("first_name", ""),
+            "last_name": row.get("last_name", ""),
+            "middle_name": row.get("middle_name", ""),
+            "role": row.get("role", "").upper()
+        }
+        yield email, defaults
+
+
+def get_user_ids(emails):
+    user_ids = {}
+    for batch in chunked(emails):
+        user_ids.update(User.objects.filter(email__in=batch).values_list("email", "id"))
+    return user_ids
+
+
+def create_users(new_users, user_ids, result):
+    # Another import running at the same time may insert the same email, or take an allocated username, between the
+    # lookup and the insert. Conflicting rows are skipped rather than failing the batch: existing emails are reused
+    # and the rest get fresh usernames on the next attempt.
+    pending = list(new_users)
+    created = []
+    for _ in range(CREATE_USER_ATTEMPTS):
+        if not pending:
+            break
+        # Imported accounts start without a usable password; users pick one through the emailed set-password link.
+        users = [
+            User(email=email, username=username, password=make_password(None), **new_users[email])
+            for email, username in zip(pending, User.objects.allocate_usernames(pending))
+        ]
+        User.objects.bulk_create(users, batch_size=BATCH_SIZE, ignore_conflicts=True)
+
+        stored = {}
+        for batch in chunked(pending):
+            stored.update((email, (pk, password)) for email, pk, password in User.objects.filter(email__in=batch).values_list("email", "id", "password"))
+        for user in users:
+            if user.email not in stored:
+                continue
+            user_ids[user.email], password = stored[user.email]
+            # The random unusable password hash tells the rows this import inserted from ones another import did.
+            if password == user.password:
+                user.pk = user_ids[user.email]
+                created.append(user)
+        pending = [email for email in pending if email not in stored]
+
+    if pending:
+        raise IntegrityError(f"Could not allocate a unique username for: {', '.join(pending)}")
+
+    queue_account_emails(created)
+    result.created_count += len(created)
+
+
+def add_members(memberships):
+    members_by_stream = defaultdict(dict)
+    for stream_id, user_id in memberships:
+        members_by_stream[stream_id][user_id] = None
+
+    links = []
+    for stream_id, user_ids in members_by_stream.items():
+        existing = set()
+        for batch in chunked(user_ids):
+            existing.update(
+                Membership.objects.filter(coursestream_id=stream_id, user_id__in=batch).values_list("user_id", flat=True)
+            )
+        links.extend(
+            Membership(coursestream_id=stream_id, user_id=user_id)
+            for user_id in user_ids
+            if user_id not in existing
+        )
+
+    Membership.objects.bulk_create(links, batch_size=BATCH_SIZE)
+    invalidate_memberships({link.user_id for link in links})
+    return len(links)
+
+
+def import_memberships(sources):
+    result = ImportResult()
+    rows = []
+    for stream, stream_rows in sources:
+        stream_rows = list(stream_rows)
+        result.processed_count += len(stream_rows)
+        rows.extend((stream.pk, email, defaults) for email, defaults in parse_rows(stream_rows))
+
+    user_ids = get_user_ids({email for _, email, _ in rows})
+
+    new_users = {}
+    memberships = []
+    for stream_id, email, defaults in rows:
+        if email not in user_ids and email not in new_users:
+            if not all(defaults[name] for name in REQUIRED_FIELDS):
+                result.warnings.append(f"Skipping user {email}: missing required fields (first_name, last_name, middle_name, role)")
+                continue
+            new_users[email] = defaults
+        memberships.append((stream_id, email))
+
+    result.skipped_count = result.processed_count - len(memberships)
+    create_users(new_users, user_ids, result)
+    result.added_count = add_members((stream_id, user_ids[email]) for stream_id, email in memberships)
+    return result
+
+
+def import_participants(stream, rows):
+    return import_memberships([(stream, rows)])
+
+
+def load_csv_file(path):
+    with open(path, encoding="utf-8", newline="") as file:
+        return list(csv.DictReader(file))
+
+
+def load_csv_files(paths, workers=None):
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(load_csv_file, paths))
+
+
+def iter_import_batches(stream, file, batch_size=BATCH_SIZE):
+    rows = read_csv_rows(file)
+    while batch := list(islice(rows, batch_size)):
+        with transaction.atomic():
+            result = import_participants(stream, batch)
+        yield result
+
+
+def create_topics(teacher, stream, items):
+    # bulk_create skips the post_save signal, so the topics cache and event stream are updated here.
+    topics = Topic.objects.bulk_create(
+        [Topic(teacher=teacher, stream=stream, title=item["title"], description=item["description"]) for item in items],
+        batch_size=BATCH_SIZE,
+    )
+    adjust_stream_stats(stream.pk, available_topics=len(topics))
+    bump_stream_version(stream.pk)
+    for data in serialize_many(TopicSerializer, topics):
+        publish_topic_event(stream.pk, "topic.created", data)
+    return topics
@@ -0,0 +1,62 @@
+from datetime import timedelta
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from .importers import iter_import_batches
+from .models import ImportJob
+
+
+MAX_STORED_ERRORS = 500
+
+
+def claimable_jobs():
+    # A RUNNING job whose worker stopped sending heartbeats (e.g. it crashed) is picked up again once its lease expires.
+    expired = timezone.now() - timedelta(seconds=settings.IMPORT_JOB_LEASE)
+    return ImportJob.objects.filter(
+        Q(status=ImportJob.JobStatus.QUEUED) | Q(status=ImportJob.JobStatus.RUNNING, heartbeat_at__lt=expired)
+    )
+
+
+def claim_next_job():
+    candidates = claimable_jobs().order_by("id").values("id", "status", "heartbeat_at")
+    for candidate in candidates[:10]:
+        now = timezone.now()
+        # Importing is idempotent, so a reclaimed job starts over and its counters are reset.
+        claimed = ImportJob.objects.filter(**candidate).update(
+            status=ImportJob.JobStatus.RUNNING, started_at=now, heartbeat_at=now,
+            rows_processed=0, rows_created=0, rows_added=0, rows_skipped=0, errors=[],
+        )
+        if claimed:
+            return ImportJob.objects.select_related("stream").get(id=candidate["id"])
+    return None
+
+
+def _record_errors(job, errors):
+    room = MAX_STORED_ERRORS - len(job.errors)
+    if room > 0:
+        job.errors.extend(errors[:room])
+
+
+def run_import_job(job):
+    try:
+        with job.file.open("rb") as file:
+            for result in iter_import_batches(job.stream, file):
+                job.rows_processed += result.processed_count
+                job.rows_created += result.created_count
+                job.rows_added += result.added_count
+                job.rows_skipped += result.skipped_count
+                _record_errors(job, result.warnings)
+                job.heartbeat_at = timezone.now()
+                job.save(update_fields=["rows_processed", "rows_created", "rows_added", "rows_skipped", "errors", "heartbeat_at"])
+    except Exception as e:
+        job.status = ImportJob.JobStatus.FAILED
+        _record_errors(job, [f"Error processing file: {e}"])
+    else:
+        job.status = ImportJob.JobStatus.DONE
+
+    # The upload holds personal data and is not needed once the job has finished.
+    job.file.delete(save=False)
+    job.finished_at = timezone.now()
+    job.save(update_fields=["status", "errors", "finished_at", "file"])
+    return job
+
@@ -0,0 +1,211 @@
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import get_resolver, reverse
+from rest_framework.authtoken.models import Token
+from users.models import User
+from .benchmarking import percentile
+from .models import Topic, TopicSubmission
+import random
+import threading
+import time
+
+
+SEARCH_QUERIES = ("програмування", "аналіз даних", "веб-застосунок", "систем", "машинне навчання")
+
+
+@dataclass
+class EndpointStats:
+    timings: list = field(default_factory=list)
+    queries: list = field(default_factory=list)
+    rejected: int = 0
+    errors: int = 0
+
+
+@dataclass
+class ScenarioResult:
+    name: str
+    elapsed: float = 0.0
+    endpoints: dict = field(default_factory=lambda: defaultdict(EndpointStats))
+
+    @property
+    def request_count(self):
+        return sum(len(stats.timings) for stats in self.endpoints.values())
+
+    @property
+    def requests_per_second(self):
+        return self.request_count / self.elapsed if self.elapsed else 0.0
+
+    def summary(self):
+        return {
+            name: {
+                "requests": len(stats.timings),
+                "p50_ms": percentile(stats.timings, 50),
+                "p95_ms": percentile(stats.timings, 95),
+                "p99_ms": percentile(stats.timings, 99),
+                "avg_queries": sum(stats.queries) / len(stats.queries) if stats.queries else 0,
+                "max_queries": max(stats.queries, default=0),
+                "rejected": stats.rejected,
+                "errors": stats.errors,
+            }
+            for name, stats in sorted(self.endpoints.items())
+        }
+
+
+class LoadClient:
+    def __init__(self, token, result, lock):
+        self.client = Client(HTTP_HOST="localhost", HTTP_AUTHORIZATION=f"Token {token}")
+        self.result = result
+        self.lock = lock
+
+    def request(self, method, url_name, data=None, **kwargs):
+        url = reverse(url_name, kwargs=kwargs)
+        started = time.perf_counter()
+        with CaptureQueriesContext(connection) as context:
+            try:
+                if data is None:
+                    response = getattr(self.client, method)(url)
+                elif method == "get":
+                    response = self.client.get(url, data)
+                else:
+                    response = getattr(self.client, method)(url, data, content_type="application/json")
+            except Exception:
+                response = None
+        duration = (time.perf_counter() - started) * 1000
+
+        with self.lock:
+            stats = self.result.endpoints[url_name]
+            stats.timings.append(duration)
+            stats.queries.append(len(context.captured_queries))
+            if response is None or response.status_code >= 500:
+                stats.errors += 1
+            elif response.status_code >= 400:
+                stats.rejected += 1
+        return response if response is not None and response.status_code < 400 else None
+
+
+def student_browse(client, user, rng):
+    for prefix in ("", "async-"):
+        streams = client.request("get", f"{prefix}my-streams")
+        for stream in (streams.json()["results"] if streams else [])[:3]:
+            client.request("get", f"{prefix}stream-topics", stream_id=stream["id"])
+        client.request("get", f"{prefix}my-submissions")
+    for stream in (streams.json()["results"] if streams else [])[:1]:
+        client.request("get", "search-stream-topics", {"q": rng.choice(SEARCH_QUERIES)}, stream_id=stream["id"])
+
+
+def mass_submission(client, user, rng):
+    streams = client.request("get", "my-streams")
+    if not streams or not streams.json()["results"]:
+        return
+    stream = rng.choice(streams.json()["results"])
+    topics = client.request("get", "stream-topics", stream_id=stream["id"])
+    if not topics or not topics.json()["results"]:
+        return
+
+    topic = rng.choice(topics.json()["results"])
+    submission = client.request("post", "create-submission", {"topic_id": topic["id"], "student_vision": "I would like to work on this topic."})
+    if submission and rng.random() < 0.3:
+        client.request("delete", "cancel-submission", submission_id=submission.json()["id"])
+
+
+def teacher_review(client, user, rng):
+    for prefix in ("", "async-"):
+        client.request("get", f"{prefix}my-topics")
+        client.request("get", f"{prefix}received-submissions")
+
+    stream_id = user.streams.values_list("id", flat=True).first()
+    if stream_id is None:
+        return
+    client.request("get", "stream-stats", stream_id=stream_id)
+    topic = client.request("post", "create-topic", {"title": "Load test topic", "description": "Created by bench_api", "stream_id": stream_id})
+    if topic:
+        topic_id = topic.json()["id"]
+        client.request("put", "update-topic", {"title": "Load test topic (edited)"}, topic_id=topic_id)
+        client.request("delete", "delete-topic", topic_id=topic_id)
+
+    topics = client.request("post", "create-topics-bulk", {
+        "stream_id": stream_id,
+        "topics": [{"title": f"Load test topic {index}", "description": "Created by bench_api"} for index in range(5)],
+    })
+    for topic in (topics.json() if topics else []):
+        client.request("delete", "delete-topic", topic_id=topic["id"])
+
+
+def teacher_approve(client, user, rng):
+    received = client.request("get", "received-submissions")
+    topics = received.json()["results"] if received else []
+    pending_by_topic = [
+        [item["id"] for item in topic["submissions"] if item["status"] == TopicSubmission.SubmissionStatus.PENDING]
+        for topic in topics
+    ]
+    pending_by_topic = [pending for pending in pending_by_topic if pending]
+
+    for pending in pending_by_topic[:2]:
+        client.request("post", "approve-submission", submission_id=pending[0])
+        for submission_id in pending[1:2]:
+            client.request("post", "reject-submission", submission_id=submission_id)
+
+    decisions = [
+        {"id": submission_id, "decision": "approve" if index == 0 else "reject"}
+        for pending in pending_by_topic[2:12]
+        for index, submission_id in enumerate(pending[:2])
+    ]
+    if decisions:
+        client.request("post", "decide-submissions", {"decisions": decisions})
+
+
+def select_actors(scenario, count, rng):
+    pending = TopicSubmission.SubmissionStatus.PENDING
+    active = [pending, TopicSubmission.SubmissionStatus.APPROVED]
+    queries = {
+        "student_browse": User.objects.filter(role=User.Role.STUDENT, streams__isnull=False),
+        "mass_submission": User.objects.filter(role=User.Role.STUDENT, streams__isnull=False).exclude(submissions__status__in=active),
+        "teacher_review": User.objects.filter(role=User.Role.TEACHER, streams__isnull=False),
+        "teacher_approve": User.objects.filter(role=User.Role.TEACHER, topics__status=Topic.TopicStatus.AVAILABLE, topics__submissions__status=pending),
+    }
+    user_ids = list(queries[scenario].values_list("id", flat=True).distinct()[:count * 10])
+    return list(User.objects.filter(id__in=rng.sample(user_ids, min(count, len(user_ids)))))
+
+
+def get_tokens(users):
+    tokens = dict(Token.objects.filter(user__in=users).values_list("user_id", "key"))
+    missing = [Token(user=user, key=Token.generate_key()) for user in users if user.pk not in tokens]
+    Token.objects.bulk_create(missing)
+    tokens.update((token.user_id, token.key) for token in missing)
+    return tokens
+
+
+SCENARIOS = {
+    "student_browse": student_browse,
+    "mass_submission": mass_submission,
+    "teacher_review": teacher_review,
+    "teacher_approve": teacher_approve,
+}
+
+
+def run_scenario(name, actors, concurrency, random_seed=0):
+    result = ScenarioResult(name)
+    lock = threading.Lock()
+    tokens = get_tokens(actors)
+
+    def run_actor(index, user):
+        try:
+            SCENARIOS[name](LoadClient(tokens[user.pk], result, lock), user, random.Random(random_seed + index))
+        finally:
+            connection.close()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(run_actor, range(len(actors)), actors))
+    result.elapsed = time.perf_counter() - started
+    return result
+
+
+def uncovered_url_names(results):
+    covered = {name for result in results for name in result.endpoints}
+    names = {name for name in get_resolver("courses.urls").reverse_dict if isinstance(name, str)}
+    return sorted(names - covered)
@@ -0,0 +1,70 @@
+from django.conf import settings
+from django.contrib.auth.tokens import default_token_generator
+from django.core.mail import EmailMessage, get_connection
+from django.utils import timezone
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+from .models import OutboxEmail
+
+
+BATCH_SIZE = 100
+MAX_ATTEMPTS = 5
+
+
+def password_set_url(user):
+    return settings.PASSWORD_SET_URL.format(
+        uid=urlsafe_base64_encode(force_bytes(user.pk)),
+        token=default_token_generator.make_token(user),
+    )
+
+
+def queue_account_emails(users):
+    OutboxEmail.objects.bulk_create(
+        [OutboxEmail(recipient=user.email, subject="Account created for 'eKafedra'", user=user) for user in users],
+        batch_size=BATCH_SIZE,
+    )
+
+
+def render_body(email):
+    if email.user_id is None:
+        return email.body
+    return f"Your account has been created\nLogin: {email.user.email}\nSet your password: {password_set_url(email.user)}"
+
+
+def _mark_failed(email, error, max_attempts):
+    email.attempts += 1
+    email.last_error = str(error)
+    if email.attempts >= max_attempts:
+        email.status = OutboxEmail.EmailStatus.FAILED
+
+
+def send_pending_emails(after_id=0, batch_size=BATCH_SIZE, max_attempts=MAX_ATTEMPTS):
+    emails = list(
+        OutboxEmail.objects.filter(status=OutboxEmail.EmailStatus.PENDING, id__gt=after_id).select_related("user").order_by("id")[:batch_size]
+    )
+    if not emails:
+        return emails
+
+    processed = set()
+    try:
+        with get_connection(fail_silently=False) as connection:
+            for email in emails:
+                try:
+                    message = EmailMessage(email.subject, render_body(email), settings.DEFAULT_FROM_EMAIL, [email.recipient], connection=connection)
+                    message.send()
+                except Exception as e:
+                    _mark_failed(email, e, max_attempts)
+                else:
+                    email.attempts += 1
+                    email.status = OutboxEmail.EmailStatus.SENT
+                    email.sent_at = timezone.now()
+                    email.body = ""
+                    email.last_error = ""
+                processed.add(email.pk)
+    except Exception as e:
+        for email in emails:
+            if email.pk not in processed:
+                _mark_failed(email, e, max_attempts)
+
+    OutboxEmail.objects.bulk_update(emails, ["status", "attempts", "last_error", "sent_at", "body"])
+    return emails
@@ -0,0 +1,81 @@
+from django.core.management.base import BaseCommand, CommandError
+from courses.loadtest import SCENARIOS, run_scenario, select_actors, uncovered_url_names
+import json
+import logging
+import random
+
+
+class Command(BaseCommand):
+    help = (
+        "Run scripted load scenarios against every courses endpoint with concurrent clients and report "
+        "requests/sec, latency percentiles and queries per request. The scenarios submit, approve and "
+        "create topics, so run them on a throwaway database filled by seed_courses"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scenario", action="append", choices=list(SCENARIOS), help="Defaults to every scenario")
+        parser.add_argument("--actors", type=int, default=200, help="Users driven through each scenario")
+        parser.add_argument("--concurrency", type=int, default=16)
+        parser.add_argument("--random-seed", type=int, default=0)
+        parser.add_argument("--output", help="Write the results as JSON to this file")
+        parser.add_argument("--baseline", help="Compare against a JSON file written by --output")
+        parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed p99 growth against the baseline")
+
+    def handle(self, *args, **options):
+        # Rejected requests are counted in the report, so only server errors are logged.
+        logging.getLogger("django.request").setLevel(logging.ERROR)
+        rng = random.Random(options["random_seed"])
+        results = []
+        for name in options["scenario"] or SCENARIOS:
+            actors = select_actors(name, options["actors"], rng)
+            if not actors:
+                raise CommandError(f"No users for the {name} scenario, run the seed_courses command first")
+            result = run_scenario(name, actors, options["concurrency"], options["random_seed"])
+            results.append(result)
+            self.report(result)
+
+        uncovered = uncovered_url_names(results)
+        if uncovered:
+            self.stdout.write(self.style.WARNING(f"Not exercised: {', '.join(uncovered)}"))
+
+        summary = {
+            result.name: {"requests_per_second": result.requests_per_second, "endpoints": result.summary()}
+            for result in results
+        }
+        if options["output"]:
+            with open(options["output"], "w") as file:
+                json.dump(summary, file, indent=2)
+
+        if options["baseline"]:
+            with open(options["baseline"]) as file:
+                regressions = self.compare(json.load(file), summary, options["tolerance"])
+            for regression in regressions:
+                self.stdout.write(self.style.ERROR(regression))
+            if regressions:
+                raise CommandError(f"{len(regressions)} regressions against {options['baseline']}")
+
+    def report(self, result):
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f"{result.name}: {result.request_count} requests in {result.elapsed:.2f} s, {result.requests_per_second:.1f} req/s"
+        ))
+        for name, stats in result.summary().items():
+            self.stdout.write(
+                f"  {name}: {stats['requests']} requests, p50 {stats['p50_ms']:.1f} ms, p95 {stats['p95_ms']:.1f} ms, "
+                f"p99 {stats['p99_ms']:.1f} ms, {stats['avg_queries']:.1f} queries (max {stats['max_queries']}), "
+                f"{stats['rejected']} rejected, {stats['errors']} errors"
+            )
+
+    def compare(self, baseline, summary, tolerance):
+        regressions = []
+        for scenario, current in summary.items():
+            for name, stats in current["endpoints"].items():
+                previous = baseline.get(scenario, {}).get("endpoints", {}).get(name)
+                if previous is None:
+                    continue
+                if stats["max_queries"] > previous["max_queries"]:
+                    regressions.append(f"{scenario} {name}: {previous['max_queries']} -> {stats['max_queries']} queries")
+                if stats["p99_ms"] > previous["p99_ms"] * (1 + tolerance):
+                    regressions.append(f"{scenario} {name}: p99 {previous['p99_ms']:.1f} -> {stats['p99_ms']:.1f} ms")
+                if stats["errors"] > previous["errors"]:
+                    regressions.append(f"{scenario} {name}: {previous['errors']} -> {stats['errors']} errors")
+        return regressions
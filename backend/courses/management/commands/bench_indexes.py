@@ -0,0 +1,86 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from courses.benchmarking import format_timings, time_calls
+from courses.models import CourseStream, Topic, TopicSubmission
+from users.models import User
+import random
+
+
+INDEXED_MODELS = (Topic, TopicSubmission)
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = "Compare query plans and latency of the hot submission and topic lookups with and without their composite indexes"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=200)
+        parser.add_argument("--random-seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["random_seed"])
+        iterations = options["iterations"]
+
+        student_ids = list(User.objects.filter(role=User.Role.STUDENT).values_list("id", flat=True)[:10000])
+        stream_ids = list(CourseStream.objects.values_list("id", flat=True)[:10000])
+        topic_ids = list(Topic.objects.values_list("id", flat=True)[:10000])
+        if not (student_ids and stream_ids and topic_ids):
+            raise CommandError("The database is empty, run the seed_courses command first")
+
+        active_statuses = [TopicSubmission.SubmissionStatus.PENDING, TopicSubmission.SubmissionStatus.APPROVED]
+        queries = {
+            "create_submission: active submission in stream": (
+                lambda args: TopicSubmission.objects.filter(student_id=args[0], topic__stream_id=args[1], status__in=active_statuses),
+                lambda: (rng.choice(student_ids), rng.choice(stream_ids)),
+            ),
+            "approve_submission: pending submissions of topic": (
+                lambda topic_id: TopicSubmission.objects.filter(topic_id=topic_id, status=TopicSubmission.SubmissionStatus.PENDING).values_list("id"),
+                lambda: rng.choice(topic_ids),
+            ),
+            "get_stream_topics: available topics of stream": (
+                lambda stream_id: Topic.objects.filter(stream_id=stream_id, status=Topic.TopicStatus.AVAILABLE).order_by("id")[:50],
+                lambda: rng.choice(stream_ids),
+            ),
+            "get_my_submissions: latest submissions of student": (
+                lambda student_id: TopicSubmission.objects.filter(student_id=student_id).order_by("-created_at", "-id")[:50],
+                lambda: rng.choice(student_ids),
+            ),
+        }
+        arguments = {name: [make_argument() for _ in range(iterations)] for name, (_, make_argument) in queries.items()}
+
+        with_indexes = self.measure(queries, arguments)
+        # Reconnect so no statement prepared against the indexed schema is reused.
+        connection.close()
+        try:
+            with transaction.atomic():
+                self.drop_indexes()
+                without_indexes = self.measure(queries, arguments)
+                raise Rollback
+        except Rollback:
+            pass
+
+        for name in queries:
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            for label, results in (("without indexes", without_indexes), ("with indexes", with_indexes)):
+                plan, timings = results[name]
+                self.stdout.write(f"  {label}: {format_timings(timings)}")
+                for line in plan.splitlines():
+                    self.stdout.write(f"    {line}")
+
+    def measure(self, queries, arguments):
+        results = {}
+        for name, (build_query, _) in queries.items():
+            plan = build_query(arguments[name][0]).explain()
+            time_calls(lambda argument: list(build_query(argument)), arguments[name])
+            timings = time_calls(lambda argument: list(build_query(argument)), arguments[name])
+            results[name] = (plan, timings)
+        return results
+
+    def drop_indexes(self):
+        with connection.cursor() as cursor:
+            for model in INDEXED_MODELS:
+                for index in model._meta.indexes:
+                    cursor.execute(f"DROP INDEX {connection.ops.quote_name(index.name)}")
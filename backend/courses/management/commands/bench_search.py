@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+from courses import queries
+from courses.benchmarking import format_timings, time_calls
+from courses.loadtest import SEARCH_QUERIES
+from courses.models import CourseStream, Topic
+from courses.search import ContainsSearchBackend, get_search_backend
+import random
+
+
+class Command(BaseCommand):
+    help = "Compare stream topic search latency of the full-text index and the icontains fallback"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=200)
+        parser.add_argument("--limit", type=int, default=50)
+        parser.add_argument("--random-seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["random_seed"])
+        stream_ids = list(CourseStream.objects.values_list("id", flat=True)[:10000])
+        if not stream_ids:
+            raise CommandError("The database is empty, run the seed_courses command first")
+
+        arguments = [(rng.choice(stream_ids), rng.choice(SEARCH_QUERIES)) for _ in range(options["iterations"])]
+        self.stdout.write(f"Searching the streams of {Topic.objects.count()} topics")
+        backends = {type(backend): backend for backend in (get_search_backend(), ContainsSearchBackend())}
+        for backend in backends.values():
+            search = lambda args: backend.search(queries.available_topics(args[0]), args[1], options["limit"], args[0])
+            time_calls(search, arguments[:10])
+            self.stdout.write(f"  {type(backend).__name__}: {format_timings(time_calls(search, arguments))}")
@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Prefetch
+from rest_framework.renderers import JSONRenderer
+from courses.benchmarking import format_timings, time_calls
+from courses.fast_serialization import FastJSONRenderer, serialize_many
+from courses.models import CourseStream, Topic, TopicSubmission
+from courses.serializers import MyStreamSerializer, TopicSerializer, TopicSubmissionSerializer, TopicWithSubmissionsSerializer
+
+
+class Command(BaseCommand):
+    help = "Compare the DRF serializer path with the compiled fast path on large lists and check their output is byte-identical"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--limit", type=int, default=1000, help="Objects per list")
+        parser.add_argument("--iterations", type=int, default=20)
+
+    def handle(self, *args, **options):
+        limit = options["limit"]
+        received_submissions = Prefetch("submissions", queryset=TopicSubmission.objects.order_by("-created_at").select_related("student"))
+        lists = {
+            "MyStreamSerializer": (MyStreamSerializer, CourseStream.objects.select_related("specialty")),
+            "TopicSerializer": (TopicSerializer, Topic.objects.select_related("teacher", "stream__specialty")),
+            "TopicSubmissionSerializer": (
+                TopicSubmissionSerializer,
+                TopicSubmission.objects.select_related("student", "topic__teacher", "topic__stream__specialty"),
+            ),
+            "TopicWithSubmissionsSerializer": (
+                TopicWithSubmissionsSerializer,
+                Topic.objects.filter(submissions__isnull=False).distinct().select_related("teacher", "stream__specialty").prefetch_related(received_submissions),
+            ),
+        }
+
+        for name, (serializer_class, queryset) in lists.items():
+            instances = list(queryset.order_by("id")[:limit])
+            if not instances:
+                raise CommandError("The database is empty, run the seed_courses command first")
+
+            drf_body = JSONRenderer().render(serializer_class(instances, many=True).data)
+            fast_body = FastJSONRenderer().render(serialize_many(serializer_class, instances))
+            runs = range(options["iterations"])
+            drf = time_calls(lambda _: JSONRenderer().render(serializer_class(instances, many=True).data), runs)
+            fast = time_calls(lambda _: FastJSONRenderer().render(serialize_many(serializer_class, instances)), runs)
+
+            self.stdout.write(self.style.MIGRATE_HEADING(f"{name} ({len(instances)} objects, {len(drf_body)} bytes)"))
+            self.stdout.write(f"  DRF:  {format_timings(drf)}")
+            self.stdout.write(f"  fast: {format_timings(fast)}")
+            if fast_body == drf_body:
+                self.stdout.write(self.style.SUCCESS("  output is byte-identical"))
+            else:
+                self.stdout.write(self.style.ERROR("  output differs from the DRF serializer"))
@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.authtoken.models import Token
+from courses.benchmarking import format_load, run_load
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare requests/sec and latency of the read endpoints served by WSGI and ASGI. "
+        "Start the servers first, e.g. `python manage.py runserver 8000 --noreload` "
+        "and `uvicorn core.asgi:application --port 8001`, against a database filled by seed_courses"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--wsgi-url", help="Base URL of the WSGI server, e.g. http://127.0.0.1:8000")
+        parser.add_argument("--asgi-url", help="Base URL of the ASGI server, e.g. http://127.0.0.1:8001")
+        parser.add_argument("--requests", type=int, default=500, help="Requests per endpoint")
+        parser.add_argument("--concurrency", type=int, default=32)
+        parser.add_argument("--sync-views", action="store_true", help="Hit the sync views on the ASGI server too")
+
+    def handle(self, *args, **options):
+        targets = [
+            ("WSGI", options["wsgi_url"], "/api/courses/"),
+            ("ASGI", options["asgi_url"], "/api/courses/" if options["sync_views"] else "/api/courses/async/"),
+        ]
+        targets = [(name, url.rstrip("/"), prefix) for name, url, prefix in targets if url]
+        if not targets:
+            raise CommandError("Pass --wsgi-url and/or --asgi-url")
+
+        student = User.objects.filter(role=User.Role.STUDENT, streams__isnull=False).first()
+        teacher = User.objects.filter(role=User.Role.TEACHER, topics__submissions__isnull=False).first()
+        if student is None or teacher is None:
+            raise CommandError("The database is empty, run the seed_courses command first")
+
+        stream_id = student.streams.values_list("id", flat=True).first()
+        endpoints = [
+            ("get_my_streams", "streams/my/", student),
+            ("get_stream_topics", f"streams/{stream_id}/topics/", student),
+            ("get_my_submissions", "submissions/my/", student),
+            ("get_my_topics", "topics/my/", teacher),
+            ("get_received_submissions", "submissions/received/", teacher),
+        ]
+        headers = {
+            user: {"Authorization": f"Token {Token.objects.get_or_create(user=user)[0].key}"}
+            for user in (student, teacher)
+        }
+
+        for name, path, user in endpoints:
+            self.stdout.write(name)
+            for server, base_url, prefix in targets:
+                url = f"{base_url}{prefix}{path}"
+                result = run_load([(url, headers[user])] * options["requests"], options["concurrency"])
+                self.stdout.write(f"  {server}: {format_load(result)}")
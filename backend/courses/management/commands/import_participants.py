@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from courses.importers import import_memberships, load_csv_files
+from courses.models import CourseStream
+
+
+class Command(BaseCommand):
+    help = "Import participants from several CSV files into their course streams in one pass"
+
+    def add_arguments(self, parser):
+        parser.add_argument("mappings", nargs="+", metavar="FILE=STREAM_ID", help="CSV file and the id of the stream it is imported into")
+        parser.add_argument("--workers", type=int, default=None, help="Number of processes used to parse the files")
+
+    def handle(self, *args, **options):
+        paths = []
+        stream_ids = []
+        for mapping in options["mappings"]:
+            path, separator, stream_id = mapping.rpartition("=")
+            if not separator or not path or not stream_id.isdigit():
+                raise CommandError(f"Invalid mapping '{mapping}', expected FILE=STREAM_ID")
+            paths.append(path)
+            stream_ids.append(int(stream_id))
+
+        streams = CourseStream.objects.in_bulk(stream_ids)
+        missing_ids = sorted(set(stream_ids) - set(streams))
+        if missing_ids:
+            raise CommandError(f"Course streams not found: {', '.join(map(str, missing_ids))}")
+
+        try:
+            files_rows = load_csv_files(paths, workers=options["workers"])
+        except (OSError, UnicodeDecodeError) as e:
+            raise CommandError(f"Error reading files: {e}")
+
+        with transaction.atomic():
+            result = import_memberships(
+                (streams[stream_id], rows) for stream_id, rows in zip(stream_ids, files_rows)
+            )
+
+        for warning in result.warnings:
+            self.stderr.write(warning)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Processed {result.processed_count} rows from {len(paths)} files: "
+            f"{result.created_count} users created, {result.added_count} memberships added, {result.skipped_count} rows skipped"
+        ))
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+from courses.stats import COUNTER_FIELDS, find_drift, rebuild_stream_stats
+
+
+class Command(BaseCommand):
+    help = "Recount per-stream topic and submission stats and repair any drift in the stored counters"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--stream", type=int, action="append", dest="stream_ids", help="Only this stream id (repeatable)")
+        parser.add_argument("--check", action="store_true", help="Report drift and exit with an error instead of repairing it")
+
+    def handle(self, *args, **options):
+        drift = find_drift(options["stream_ids"]) if options["check"] else rebuild_stream_stats(options["stream_ids"])
+
+        for stream_id, (stored, expected) in sorted(drift.items()):
+            if stored is None:
+                self.stdout.write(f"Stream {stream_id}: no stats row")
+                continue
+            changes = ", ".join(
+                f"{name} {stored[name]} -> {expected[name]}" for name in COUNTER_FIELDS if stored[name] != expected[name]
+            )
+            self.stdout.write(f"Stream {stream_id}: {changes}")
+
+        if options["check"]:
+            if drift:
+                raise CommandError(f"{len(drift)} streams have drifted stats")
+            self.stdout.write(self.style.SUCCESS("Stream stats are up to date"))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Rebuilt stats for {len(drift)} streams"))
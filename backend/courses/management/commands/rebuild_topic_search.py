@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+from courses.search import rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = "Recreate the SQLite full-text index triggers and reindex every topic"
+
+    def handle(self, *args, **options):
+        if rebuild_search_index():
+            self.stdout.write(self.style.SUCCESS("Rebuilt the topic search index"))
+        else:
+            self.stdout.write("This database has no full-text index, topic search uses the unindexed fallback")
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+from courses.jobs import claim_next_job, run_import_job
+import time
+
+
+class Command(BaseCommand):
+    help = "Run queued participant import jobs"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--loop", action="store_true", help="Keep polling for new jobs instead of exiting when the queue is empty")
+        parser.add_argument("--interval", type=float, default=2.0, help="Seconds to wait between polls in --loop mode")
+
+    def handle(self, *args, **options):
+        while True:
+            job = claim_next_job()
+            if job is not None:
+                run_import_job(job)
+                self.stdout.write(
+                    f"Job {job.pk} {job.get_status_display().lower()}: {job.rows_processed} rows processed, "
+                    f"{job.rows_created} users created, {job.rows_added} added, {job.rows_skipped} skipped"
+                )
+                continue
+
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
@@ -0,0 +1,141 @@
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from courses.importers import BATCH_SIZE
+from courses.models import Specialty, CourseStream, Topic, TopicSubmission
+from courses.stats import rebuild_stream_stats
+from users.models import User
+from datetime import timedelta
+import random
+
+
+# Ukrainian words in several inflected forms, so topic search has realistic text to index.
+TOPIC_SUBJECTS = ("Розробка", "Аналіз", "Дослідження", "Проєктування", "Моделювання", "Оптимізація", "Тестування")
+TOPIC_DOMAINS = (
+    "веб-застосунку", "системи керування", "алгоритмів машинного навчання", "баз даних", "мобільних застосунків",
+    "розподілених систем", "програмування мікроконтролерів", "аналізу даних", "комп'ютерних мереж", "інтерфейсів користувача",
+)
+
+
+class Command(BaseCommand):
+    help = "Fill the database with a large synthetic dataset for benchmarks"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--specialties", type=int, default=5)
+        parser.add_argument("--streams", type=int, default=1000)
+        parser.add_argument("--students-per-stream", type=int, default=50)
+        parser.add_argument("--teachers", type=int, default=300)
+        parser.add_argument("--teachers-per-stream", type=int, default=3)
+        parser.add_argument("--topics-per-stream", type=int, default=40)
+        parser.add_argument("--submission-rate", type=float, default=0.8, help="Share of students that submit a topic in each of their streams")
+        parser.add_argument("--password", default="password", help="Password set for every generated user")
+        parser.add_argument("--random-seed", type=int, default=0)
+
+    @transaction.atomic
+    def handle(self, *args, **options):
+        rng = random.Random(options["random_seed"])
+        run = timezone.now().strftime("%Y%m%d%H%M%S")
+        password_hash = make_password(options["password"])
+
+        specialties = Specialty.objects.bulk_create(
+            [Specialty(code=f"S{run}{i}", name=f"Specialty {i}") for i in range(options["specialties"])]
+        )
+        teachers = self.create_users("teacher", User.Role.TEACHER, options["teachers"], run, password_hash)
+
+        streams = CourseStream.objects.bulk_create(
+            [
+                CourseStream(
+                    name=f"Stream {run}-{i}",
+                    academic_year=rng.choice(["2023-2024", "2024-2025", "2025-2026"]),
+                    semester=rng.randint(1, 2),
+                    course_number=rng.randint(1, 4),
+                    specialty=rng.choice(specialties),
+                    is_active=rng.random() < 0.8,
+                )
+                for i in range(options["streams"])
+            ],
+            batch_size=BATCH_SIZE,
+        )
+
+        Membership = CourseStream.users.through
+        memberships = []
+        topics = []
+        students_by_stream = {}
+        for stream in streams:
+            stream_teachers = rng.sample(teachers, min(options["teachers_per_stream"], len(teachers)))
+            students = self.create_users("student", User.Role.STUDENT, options["students_per_stream"], f"{run}s{stream.pk}", password_hash)
+            students_by_stream[stream.pk] = students
+            memberships.extend(Membership(coursestream_id=stream.pk, user_id=user.pk) for user in stream_teachers + students)
+            topics.extend(
+                Topic(
+                    title=f"{rng.choice(TOPIC_SUBJECTS)} {rng.choice(TOPIC_DOMAINS)} ({i})",
+                    description=f"Тема {i} потоку {stream.name}: {rng.choice(TOPIC_SUBJECTS).lower()} {rng.choice(TOPIC_DOMAINS)}. " * 5,
+                    teacher=rng.choice(stream_teachers),
+                    stream=stream,
+                )
+                for i in range(options["topics_per_stream"])
+            )
+        Membership.objects.bulk_create(memberships, batch_size=BATCH_SIZE)
+        Topic.objects.bulk_create(topics, batch_size=BATCH_SIZE)
+
+        topics_by_stream = {}
+        for topic in topics:
+            topics_by_stream.setdefault(topic.stream_id, []).append(topic)
+
+        submissions = []
+        created_dates = []
+        taken_topics = []
+        started = timezone.now() - timedelta(days=30)
+        for stream_id, students in students_by_stream.items():
+            stream_topics = topics_by_stream.get(stream_id, [])
+            approved_topics = set()
+            for student in students:
+                if not stream_topics or rng.random() >= options["submission_rate"]:
+                    continue
+                topic = rng.choice(stream_topics)
+                submission_status = rng.choice(TopicSubmission.SubmissionStatus.values)
+                if submission_status == TopicSubmission.SubmissionStatus.APPROVED and topic.pk in approved_topics:
+                    submission_status = TopicSubmission.SubmissionStatus.PENDING
+                if submission_status == TopicSubmission.SubmissionStatus.APPROVED:
+                    approved_topics.add(topic.pk)
+                    topic.status = Topic.TopicStatus.TAKEN
+                    taken_topics.append(topic)
+                submissions.append(
+                    TopicSubmission(
+                        student=student,
+                        topic=topic,
+                        stream_id=topic.stream_id,
+                        status=submission_status,
+                        student_vision="I would like to work on this topic.",
+                    )
+                )
+                created_dates.append(started + timedelta(seconds=rng.randint(0, 30 * 24 * 3600)))
+        Topic.objects.bulk_update(taken_topics, ["status"], batch_size=BATCH_SIZE)
+        TopicSubmission.objects.bulk_create(submissions, batch_size=BATCH_SIZE)
+        for submission, created_at in zip(submissions, created_dates):
+            submission.created_at = created_at
+        TopicSubmission.objects.bulk_update(submissions, ["created_at"], batch_size=BATCH_SIZE)
+        rebuild_stream_stats([stream.pk for stream in streams])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {len(specialties)} specialties, {len(streams)} streams, {len(teachers)} teachers, "
+            f"{sum(map(len, students_by_stream.values()))} students, {len(topics)} topics and {len(submissions)} submissions"
+        ))
+
+    def create_users(self, prefix, role, count, run, password_hash):
+        return User.objects.bulk_create(
+            [
+                User(
+                    email=f"{prefix}{i}.{run}@seed.example",
+                    username=f"{prefix}{i}.{run}",
+                    first_name=prefix.capitalize(),
+                    last_name=str(i),
+                    middle_name="Seed",
+                    role=role,
+                    password=password_hash,
+                )
+                for i in range(count)
+            ],
+            batch_size=BATCH_SIZE,
+        )
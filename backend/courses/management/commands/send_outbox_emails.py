@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+from courses.mail import BATCH_SIZE, MAX_ATTEMPTS, send_pending_emails
+from courses.models import OutboxEmail
+import time
+
+
+class Command(BaseCommand):
+    help = "Send pending emails from the outbox over a single reused mail connection per batch"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+        parser.add_argument("--max-attempts", type=int, default=MAX_ATTEMPTS)
+        parser.add_argument("--loop", action="store_true", help="Keep polling the outbox instead of exiting when it is drained")
+        parser.add_argument("--interval", type=float, default=5.0, help="Seconds to wait between polls in --loop mode")
+
+    def handle(self, *args, **options):
+        last_id = 0
+        while True:
+            emails = send_pending_emails(
+                after_id=last_id,
+                batch_size=options["batch_size"],
+                max_attempts=options["max_attempts"],
+            )
+            if emails:
+                last_id = emails[-1].id
+                sent_count = sum(email.status == OutboxEmail.EmailStatus.SENT for email in emails)
+                self.stdout.write(f"Sent {sent_count} of {len(emails)} emails")
+                continue
+
+            if not options["loop"]:
+                break
+            last_id = 0
+            time.sleep(options["interval"])
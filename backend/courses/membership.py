@@ -0,0 +1,46 @@
+from django.core.cache import cache
+from django.db import transaction
+from .models import CourseStream
+
+
+CACHE_TIMEOUT = 300
+Membership = CourseStream.users.through
+
+
+def _cache_key(user_id):
+    return f"courses:stream-ids:{user_id}"
+
+
+def get_stream_ids(user):
+    key = _cache_key(user.pk)
+    stream_ids = cache.get(key)
+    if stream_ids is None:
+        stream_ids = frozenset(Membership.objects.filter(user_id=user.pk).values_list("coursestream_id", flat=True))
+        cache.set(key, stream_ids, CACHE_TIMEOUT)
+    return stream_ids
+
+
+def is_member(user, stream):
+    return getattr(stream, "pk", stream) in get_stream_ids(user)
+
+
+async def aget_stream_ids(user):
+    key = _cache_key(user.pk)
+    stream_ids = await cache.aget(key)
+    if stream_ids is None:
+        stream_ids = frozenset([
+            stream_id async for stream_id in Membership.objects.filter(user_id=user.pk).values_list("coursestream_id", flat=True)
+        ])
+        await cache.aset(key, stream_ids, CACHE_TIMEOUT)
+    return stream_ids
+
+
+async def ais_member(user, stream):
+    return getattr(stream, "pk", stream) in await aget_stream_ids(user)
+
+
+def invalidate(user_ids):
+    # Delete again after commit so a reader that cached the pre-commit memberships in the meantime is discarded.
+    keys = [_cache_key(user_id) for user_id in user_ids]
+    cache.delete_many(keys)
+    transaction.on_commit(lambda: cache.delete_many(keys))
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.8 on 2026-10-18 11:04
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0005_importjob'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='topic',
+            index=models.Index(fields=['stream', 'status'], name='topic_stream_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='topicsubmission',
+            index=models.Index(fields=['topic', 'status'], name='submission_topic_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='topicsubmission',
+            index=models.Index(fields=['student', 'status'], name='submission_student_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='topicsubmission',
+            index=models.Index(fields=['student', '-created_at', '-id'], name='submission_student_recent_idx'),
+        ),
+    ]
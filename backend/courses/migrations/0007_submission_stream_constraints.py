@@ -0,0 +1,65 @@
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+import django.db.models.deletion
+
+
+ACTIVE_STATUSES = ["PENDING", "APPROVED"]
+
+
+def backfill_submission_stream(apps, schema_editor):
+    Topic = apps.get_model("courses", "Topic")
+    TopicSubmission = apps.get_model("courses", "TopicSubmission")
+
+    TopicSubmission.objects.update(
+        stream_id=Subquery(Topic.objects.filter(pk=OuterRef("topic_id")).values("stream_id")[:1])
+    )
+
+    approved_topics = set()
+    active_students = set()
+    conflicts = []
+    for submission in TopicSubmission.objects.filter(status__in=ACTIVE_STATUSES).order_by("status", "created_at", "id"):
+        duplicate_approval = submission.status == "APPROVED" and submission.topic_id in approved_topics
+        duplicate_active = (submission.student_id, submission.stream_id) in active_students
+        if duplicate_approval or duplicate_active:
+            conflicts.append(submission.pk)
+            continue
+        if submission.status == "APPROVED":
+            approved_topics.add(submission.topic_id)
+        active_students.add((submission.student_id, submission.stream_id))
+
+    # Picking which duplicate survives is a decision about real students, so it is left to an operator.
+    if conflicts:
+        raise RuntimeError(
+            "Cannot add the active submission constraints: submissions "
+            f"{', '.join(map(str, conflicts))} duplicate an earlier active submission for the same student and stream "
+            "or an earlier approval of the same topic. Reject or cancel them and run the migration again."
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0006_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='topicsubmission',
+            name='stream',
+            field=models.ForeignKey(editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='submissions', to='courses.coursestream'),
+        ),
+        migrations.RunPython(backfill_submission_stream, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='topicsubmission',
+            name='stream',
+            field=models.ForeignKey(editable=False, on_delete=django.db.models.deletion.CASCADE, related_name='submissions', to='courses.coursestream'),
+        ),
+        migrations.AddConstraint(
+            model_name='topicsubmission',
+            constraint=models.UniqueConstraint(condition=models.Q(('status__in', ['PENDING', 'APPROVED'])), fields=('student', 'stream'), name='unique_active_submission_per_stream'),
+        ),
+        migrations.AddConstraint(
+            model_name='topicsubmission',
+            constraint=models.UniqueConstraint(condition=models.Q(('status', 'APPROVED')), fields=('topic',), name='unique_approved_submission_per_topic'),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.8 on 2026-10-18 11:33
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+
+
+TOPIC_FIELDS = {"AVAILABLE": "available_topics", "TAKEN": "taken_topics"}
+SUBMISSION_FIELDS = {"PENDING": "pending_submissions", "APPROVED": "approved_submissions", "REJECTED": "rejected_submissions"}
+
+
+def backfill_stream_stats(apps, schema_editor):
+    CourseStream = apps.get_model("courses", "CourseStream")
+    StreamStats = apps.get_model("courses", "StreamStats")
+    Topic = apps.get_model("courses", "Topic")
+    TopicSubmission = apps.get_model("courses", "TopicSubmission")
+
+    stats = {stream_id: StreamStats(stream_id=stream_id) for stream_id in CourseStream.objects.values_list("id", flat=True)}
+    for model, fields in ((Topic, TOPIC_FIELDS), (TopicSubmission, SUBMISSION_FIELDS)):
+        for stream_id, status, count in model.objects.order_by().values("stream_id", "status").annotate(count=Count("id")).values_list("stream_id", "status", "count"):
+            setattr(stats[stream_id], fields[status], count)
+    StreamStats.objects.bulk_create(stats.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0007_submission_stream_constraints'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StreamStats',
+            fields=[
+                ('stream', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='courses.coursestream')),
+                ('available_topics', models.IntegerField(default=0)),
+                ('taken_topics', models.IntegerField(default=0)),
+                ('pending_submissions', models.IntegerField(default=0)),
+                ('approved_submissions', models.IntegerField(default=0)),
+                ('rejected_submissions', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(backfill_stream_stats, migrations.RunPython.noop),
+    ]
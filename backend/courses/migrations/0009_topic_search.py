@@ -0,0 +1,60 @@
+from django.db import migrations
+
+
+# Only SQLite gets the FTS5 index; other databases use the unindexed fallback in courses.search.
+# Django rebuilds a SQLite table to alter it, which drops these triggers; courses.search.ensure_search_index
+# restores them after every migrate.
+CREATE_SQL = [
+    """
+    CREATE VIRTUAL TABLE courses_topic_search USING fts5(
+        title, description, stream, tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER courses_topic_search_insert AFTER INSERT ON courses_topic BEGIN
+        INSERT INTO courses_topic_search(rowid, title, description, stream) VALUES (new.id, new.title, new.description, 's' || new.stream_id);
+    END
+    """,
+    """
+    CREATE TRIGGER courses_topic_search_delete AFTER DELETE ON courses_topic BEGIN
+        DELETE FROM courses_topic_search WHERE rowid = old.id;
+    END
+    """,
+    """
+    CREATE TRIGGER courses_topic_search_update AFTER UPDATE OF title, description, stream_id ON courses_topic BEGIN
+        UPDATE courses_topic_search SET title = new.title, description = new.description, stream = 's' || new.stream_id WHERE rowid = old.id;
+    END
+    """,
+    "INSERT INTO courses_topic_search(rowid, title, description, stream) SELECT id, title, description, 's' || stream_id FROM courses_topic",
+]
+DROP_SQL = [
+    "DROP TRIGGER IF EXISTS courses_topic_search_insert",
+    "DROP TRIGGER IF EXISTS courses_topic_search_delete",
+    "DROP TRIGGER IF EXISTS courses_topic_search_update",
+    "DROP TABLE IF EXISTS courses_topic_search",
+]
+
+
+def has_fts5(connection):
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+        return bool(cursor.fetchone()[0])
+
+
+def run_sqlite(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor == "sqlite" and has_fts5(schema_editor.connection):
+            for statement in statements:
+                schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0008_stream_stats'),
+    ]
+
+    operations = [
+        migrations.RunPython(run_sqlite(CREATE_SQL), run_sqlite(DROP_SQL)),
+    ]
@@ -34,6 +34,11 @@ class Topic(models.Model):
     teacher = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.PROTECT, limit_choices_to={"role": "TEACHER"}, related_name="topics")
     stream = models.ForeignKey(CourseStream, on_delete=models.CASCADE, related_name="topics")
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["stream", "status"], name="topic_stream_status_idx"),
+        ]
+
     def __str__(self):
         return self.title
 
@@ -47,8 +52,98 @@ class TopicSubmission(models.Model):
     status = models.CharField(max_length=10, choices=SubmissionStatus.choices, default=SubmissionStatus.PENDING)
     student = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, limit_choices_to={"role": "STUDENT"}, related_name="submissions")
     topic = models.ForeignKey(Topic, on_delete=models.CASCADE, related_name="submissions")
+    stream = models.ForeignKey(CourseStream, on_delete=models.CASCADE, related_name="submissions", editable=False)
     student_vision = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["topic", "status"], name="submission_topic_status_idx"),
+            models.Index(fields=["student", "status"], name="submission_student_status_idx"),
+            models.Index(fields=["student", "-created_at", "-id"], name="submission_student_recent_idx"),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["student", "stream"],
+                condition=models.Q(status__in=["PENDING", "APPROVED"]),
+                name="unique_active_submission_per_stream",
+            ),
+            models.UniqueConstraint(
+                fields=["topic"],
+                condition=models.Q(status="APPROVED"),
+                name="unique_approved_submission_per_topic",
+            ),
+        ]
+
+    def save(self, *args, **kwargs):
+        if self.stream_id is None and self.topic_id is not None:
+            self.stream_id = self.topic.stream_id
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return f'Submission for "{self.topic.title}" by {self.student.email}'
+
+
+class StreamStats(models.Model):
+    # Counters kept in step with Topic and TopicSubmission by courses.stats; rebuild_stream_stats repairs drift.
+    stream = models.OneToOneField(CourseStream, on_delete=models.CASCADE, primary_key=True, related_name="stats")
+    available_topics = models.IntegerField(default=0)
+    taken_topics = models.IntegerField(default=0)
+    pending_submissions = models.IntegerField(default=0)
+    approved_submissions = models.IntegerField(default=0)
+    rejected_submissions = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"Stats for {self.stream_id}"
+
+
+class OutboxEmail(models.Model):
+    class EmailStatus(models.TextChoices):
+        PENDING = "PENDING", "Pending"
+        SENT = "SENT", "Sent"
+        FAILED = "FAILED", "Failed"
+
+    recipient = models.EmailField()
+    subject = models.CharField(max_length=255)
+    body = models.TextField(blank=True)
+    # Account emails are rendered for this user at send time, so the set-password link is never stored.
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, null=True, blank=True, related_name="+")
+    status = models.CharField(max_length=10, choices=EmailStatus.choices, default=EmailStatus.PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["status", "id"])]
+
+    def __str__(self):
+        return f"{self.subject} to {self.recipient}"
+
+
+class ImportJob(models.Model):
+    class JobStatus(models.TextChoices):
+        QUEUED = "QUEUED", "Queued"
+        RUNNING = "RUNNING", "Running"
+        DONE = "DONE", "Done"
+        FAILED = "FAILED", "Failed"
+
+    stream = models.ForeignKey(CourseStream, on_delete=models.CASCADE, related_name="import_jobs")
+    file = models.FileField(upload_to="imports/")
+    status = models.CharField(max_length=10, choices=JobStatus.choices, default=JobStatus.QUEUED)
+    rows_processed = models.PositiveIntegerField(default=0)
+    rows_created = models.PositiveIntegerField(default=0)
+    rows_added = models.PositiveIntegerField(default=0)
+    rows_skipped = models.PositiveIntegerField(default=0)
+    errors = models.JSONField(default=list, blank=True)
+    created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name="+")
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["status", "id"])]
+
     def __str__(self):
-        return f'Submission for "{self.topic.title}" by {self.student.email}'
\ No newline at end of file
+        return f"Import into {self.stream} ({self.get_status_display()})"
@@ -0,0 +1,105 @@
+from django.core.paginator import Paginator
+from django.db import connection
+from django.db.models import QuerySet
+from django.utils.functional import cached_property
+from rest_framework.pagination import CursorPagination, _reverse_ordering
+from rest_framework.request import Request
+from .fast_serialization import serialize_many
+from .fieldsets import fieldset_from_request, narrow_queryset
+
+
+ESTIMATE_THRESHOLD = 10000
+
+
+def estimate_row_count(model):
+    table = connection.ops.quote_name(model._meta.db_table)
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass", [model._meta.db_table])
+        elif connection.vendor == "sqlite":
+            # Reads the last rowid from the end of the table b-tree; deleted rows make this an overestimate.
+            cursor.execute(f"SELECT MAX(rowid) FROM {table}")
+        else:
+            return None
+        row = cursor.fetchone()
+    return row[0] if row and row[0] and row[0] > 0 else None
+
+
+class EstimatedCountPaginator(Paginator):
+    # Admin changelists over an unfiltered table page by an estimate instead of a COUNT(*) over every row.
+
+    @cached_property
+    def count(self):
+        if isinstance(self.object_list, QuerySet) and not self.object_list.query.where:
+            estimate = estimate_row_count(self.object_list.model)
+            if estimate is not None and estimate > ESTIMATE_THRESHOLD:
+                return estimate
+        return super().count
+
+
+class KeysetPagination(CursorPagination):
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+
+    def __init__(self, ordering):
+        self.ordering = ordering
+
+    async def apaginate_queryset(self, queryset, request):
+        # Same cursor semantics as paginate_queryset, with the page fetched through the async ORM.
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.base_url = request.build_absolute_uri()
+        self.cursor = self.decode_cursor(request)
+        offset, reverse, current_position = self.cursor or (0, False, None)
+
+        queryset = queryset.order_by(*(_reverse_ordering(self.ordering) if reverse else self.ordering))
+        if current_position is not None:
+            order = self.ordering[0]
+            lookup = 'lt' if self.cursor.reverse != order.startswith('-') else 'gt'
+            queryset = queryset.filter(**{f"{order.lstrip('-')}__{lookup}": current_position})
+
+        results = [item async for item in queryset[offset:offset + self.page_size + 1]]
+        self.page = results[:self.page_size]
+        following_position = None
+        if len(results) > len(self.page):
+            following_position = self._get_position_from_instance(results[-1], self.ordering)
+
+        if reverse:
+            self.page.reverse()
+            self.has_next = current_position is not None or offset > 0
+            self.has_previous = following_position is not None
+            self.next_position, self.previous_position = current_position, following_position
+        else:
+            self.has_next = following_position is not None
+            self.has_previous = current_position is not None or offset > 0
+            self.next_position, self.previous_position = following_position, current_position
+        return self.page
+
+    def get_paginated_data(self, data):
+        return {
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        }
+
+
+def _ordering_columns(ordering):
+    return [name.lstrip('-') for name in ordering]
+
+
+def paginated_response(request, queryset, serializer_class, ordering):
+    fieldset = fieldset_from_request(request, serializer_class)
+    queryset = narrow_queryset(queryset, serializer_class, fieldset, _ordering_columns(ordering))
+    paginator = KeysetPagination(ordering)
+    page = paginator.paginate_queryset(queryset, request)
+    return paginator.get_paginated_response(serialize_many(serializer_class, page, fieldset))
+
+
+async def apaginated_data(request, queryset, serializer_class, ordering):
+    request = Request(request)
+    fieldset = fieldset_from_request(request, serializer_class)
+    queryset = narrow_queryset(queryset, serializer_class, fieldset, _ordering_columns(ordering))
+    paginator = KeysetPagination(ordering)
+    page = await paginator.apaginate_queryset(queryset, request)
+    return paginator.get_paginated_data(serialize_many(serializer_class, page, fieldset))
@@ -0,0 +1,36 @@
+from django.db.models import Max, Prefetch
+from .models import Topic, TopicSubmission
+
+
+def my_streams(user, is_active):
+    return user.streams.filter(is_active=is_active).select_related('specialty')
+
+
+def available_topics(stream_id):
+    return Topic.objects.filter(stream_id=stream_id, status=Topic.TopicStatus.AVAILABLE).select_related('teacher', 'stream__specialty')
+
+
+def my_submissions(user):
+    return user.submissions.select_related('student', 'topic__teacher', 'topic__stream__specialty')
+
+
+def my_topics(user, is_active):
+    return user.topics.filter(stream__is_active=is_active).select_related('teacher', 'stream__specialty')
+
+
+def received_submissions(user):
+    prefetch_submissions = Prefetch(
+        'submissions',
+        queryset=TopicSubmission.objects.order_by('-created_at').select_related('student'),
+    )
+
+    return Topic.objects.filter(
+        teacher=user,
+        submissions__isnull=False
+    ).annotate(
+        latest_submission_date=Max('submissions__created_at')
+    ).distinct().select_related(
+        'teacher', 'stream__specialty'
+    ).prefetch_related(
+        prefetch_submissions
+    )
@@ -0,0 +1,158 @@
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+import re
+
+
+SEARCH_TABLE = "courses_topic_search"
+MAX_TERMS = 8
+MIN_STEM_LENGTH = 3
+SQLITE_SCHEMA = (
+    # The stream column holds one "s<stream id>" token, so a stream-scoped query only ranks that stream's topics.
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5(
+        title, description, stream, tokenize='unicode61 remove_diacritics 2'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_insert AFTER INSERT ON courses_topic BEGIN
+        INSERT INTO {SEARCH_TABLE}(rowid, title, description, stream) VALUES (new.id, new.title, new.description, 's' || new.stream_id);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_delete AFTER DELETE ON courses_topic BEGIN
+        DELETE FROM {SEARCH_TABLE} WHERE rowid = old.id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_update AFTER UPDATE OF title, description, stream_id ON courses_topic BEGIN
+        UPDATE {SEARCH_TABLE} SET title = new.title, description = new.description, stream = 's' || new.stream_id WHERE rowid = old.id;
+    END""",
+)
+SQLITE_TRIGGERS = frozenset({f"{SEARCH_TABLE}_insert", f"{SEARCH_TABLE}_delete", f"{SEARCH_TABLE}_update"})
+REBUILD_SQL = (
+    f"DELETE FROM {SEARCH_TABLE}",
+    f"INSERT INTO {SEARCH_TABLE}(rowid, title, description, stream) SELECT id, title, description, 's' || stream_id FROM courses_topic",
+)
+WORD_RE = re.compile(r"\w+")
+CYRILLIC_RE = re.compile(r"[а-яіїєґ]")
+STOP_WORDS = frozenset({"і", "й", "та", "а", "в", "у", "з", "із", "зі", "на", "до", "для", "по", "про", "при", "від", "the", "of", "and", "for", "in", "on"})
+
+# Inflectional endings of Ukrainian nouns and adjectives, longest first. The remaining stem is matched as a prefix,
+# so "програмування" and "програмуванням" both become "програмуванн" and find each other.
+UKRAINIAN_SUFFIXES = (
+    "ями", "ами", "ими", "іми", "ові", "еві", "єві", "ого", "ому", "ої", "ою", "ею", "єю", "ій", "ий", "их", "іх",
+    "ях", "ах", "ів", "їв", "ям", "ам", "ом", "ем", "єм", "им", "ім",
+    "а", "я", "о", "е", "є", "у", "ю", "і", "ї", "и", "ь", "й",
+)
+
+
+def stem(word):
+    if not CYRILLIC_RE.search(word):
+        return word
+    for suffix in UKRAINIAN_SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= MIN_STEM_LENGTH:
+            return word[:-len(suffix)]
+    return word
+
+
+def search_terms(query):
+    words = WORD_RE.findall(query.lower())
+    words = [word for word in words if word not in STOP_WORDS] or words
+    return [stem(word) for word in words[:MAX_TERMS]]
+
+
+class TopicSearchBackend(ABC):
+    # filter() narrows the queryset to topics that match every term of the query; search() returns up to limit
+    # of them, best first. A PostgreSQL backend would store a tsvector of title and description and rank with ts_rank.
+
+    @abstractmethod
+    def filter(self, queryset, query):
+        ...
+
+    @abstractmethod
+    def search(self, queryset, query, limit, stream_id=None):
+        ...
+
+
+class ContainsSearchBackend(TopicSearchBackend):
+    # Unindexed fallback for databases without a full-text index.
+
+    def filter(self, queryset, query):
+        for term in search_terms(query):
+            queryset = queryset.filter(Q(title__icontains=term) | Q(description__icontains=term))
+        return queryset
+
+    def search(self, queryset, query, limit, stream_id=None):
+        if not search_terms(query):
+            return []
+        return list(self.filter(queryset, query).order_by("id")[:limit])
+
+
+class SQLiteSearchBackend(TopicSearchBackend):
+    # FTS5 index kept in step with courses_topic by triggers (migration 0009, restored after every migrate by
+    # ensure_search_index); title matches weigh more in bm25.
+
+    def match_expression(self, query, stream_id=None):
+        terms = " ".join(f'"{term}"*' for term in search_terms(query))
+        if not terms:
+            return ""
+        match = f"{{title description}} : ({terms})"
+        return match if stream_id is None else f'stream : "s{int(stream_id)}" AND {match}'
+
+    def filter(self, queryset, query):
+        match = self.match_expression(query)
+        if not match:
+            return queryset
+        return queryset.filter(id__in=RawSQL(f"SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s", [match]))
+
+    def search(self, queryset, query, limit, stream_id=None):
+        match = self.match_expression(query, stream_id)
+        if not match:
+            return []
+
+        candidates, params = queryset.order_by().values("id").query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                # The unary + keeps the candidate filter out of the FTS5 lookup, which would otherwise slow it down badly.
+                f"SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s AND +rowid IN ({candidates}) "
+                f"ORDER BY bm25({SEARCH_TABLE}, 10.0, 1.0, 0.0), rowid LIMIT %s",
+                [match, *params, limit],
+            )
+            ids = [row[0] for row in cursor.fetchall()]
+
+        topics = queryset.in_bulk(ids)
+        return [topics[topic_id] for topic_id in ids if topic_id in topics]
+
+
+@lru_cache(maxsize=None)
+def _backend_for(alias):
+    if connection.vendor == "sqlite" and SEARCH_TABLE in connection.introspection.table_names():
+        return SQLiteSearchBackend()
+    return ContainsSearchBackend()
+
+
+def get_search_backend():
+    return _backend_for(connection.alias)
+
+
+def search_topics(queryset, query, limit, stream_id=None):
+    return get_search_backend().search(queryset, query, limit, stream_id)
+
+
+def rebuild_search_index(using=DEFAULT_DB_ALIAS):
+    # Restores the triggers (a SQLite table rebuild drops them) and reindexes every topic.
+    if connections[using].vendor != "sqlite":
+        return False
+    with connections[using].cursor() as cursor:
+        for statement in SQLITE_SCHEMA + REBUILD_SQL:
+            cursor.execute(statement)
+    _backend_for.cache_clear()
+    return True
+
+
+def ensure_search_index(using=DEFAULT_DB_ALIAS):
+    # Any migration that makes Django rebuild courses_topic on SQLite silently drops the triggers; put them back.
+    db = connections[using]
+    if db.vendor != "sqlite" or SEARCH_TABLE not in db.introspection.table_names():
+        return False
+    with db.cursor() as cursor:
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'courses_topic'")
+        if SQLITE_TRIGGERS <= {row[0] for row in cursor.fetchall()}:
+            return False
+    return rebuild_search_index(using)
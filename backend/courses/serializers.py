@@ -1,21 +1,43 @@
 from rest_framework import serializers
-from .models import CourseStream, Topic, TopicSubmission, Specialty
+from .fieldsets import PK_ONLY
+from .models import CourseStream, Topic, TopicSubmission, Specialty, StreamStats
 from users.models import User
 
 
-class UserSimpleSerializer(serializers.ModelSerializer):
+class SparseFieldsetMixin:
+    def __init__(self, *args, fieldset=None, **kwargs):
+        self.fieldset = fieldset
+        super().__init__(*args, **kwargs)
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if self.fieldset is None:
+            return fields
+        return {name: self.narrow_field(fields[name], subset) for name, subset in self.fieldset if name in fields}
+
+    def narrow_field(self, field, subset):
+        many = isinstance(field, serializers.ListSerializer)
+        nested = field.child if many else field
+        if not isinstance(nested, serializers.BaseSerializer):
+            return field
+        if subset == PK_ONLY:
+            return serializers.PrimaryKeyRelatedField(many=many, read_only=True, source=field.source)
+        return type(nested)(*nested._args, **{**nested._kwargs, 'many': many, 'fieldset': subset})
+
+
+class UserSimpleSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ('first_name', 'last_name', 'middle_name', 'email')
 
 
-class SpecialtySerializer(serializers.ModelSerializer):
+class SpecialtySerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Specialty
         fields = ('code', 'name')
 
 
-class MyStreamSerializer(serializers.ModelSerializer):
+class MyStreamSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     specialty = SpecialtySerializer(read_only=True)
 
     class Meta:
@@ -45,7 +67,7 @@ class TopicStreamSerializer(serializers.ModelSerializer):
         fields = ('id', 'name',)
 
 
-class TopicSerializer(serializers.ModelSerializer):
+class TopicSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     teacher = UserSimpleSerializer(read_only=True)
     stream = MyStreamSerializer(read_only=True)
 
@@ -69,7 +91,7 @@ class SubmissionTopicSerializer(serializers.ModelSerializer):
         fields = ('title', 'description')
 
 
-class TopicSubmissionSerializer(serializers.ModelSerializer):
+class TopicSubmissionSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     topic = TopicSerializer(read_only=True)
     student = UserSimpleSerializer(read_only=True)
 
@@ -78,8 +100,16 @@ class TopicSubmissionSerializer(serializers.ModelSerializer):
         fields = ('id', 'status', 'topic', 'student', 'student_vision', 'created_at')
 
 
+class ReceivedSubmissionSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    student = UserSimpleSerializer(read_only=True)
+
+    class Meta:
+        model = TopicSubmission
+        fields = ('id', 'status', 'student', 'student_vision', 'created_at')
+
+
 class TopicWithSubmissionsSerializer(TopicSerializer):
-    submissions = TopicSubmissionSerializer(many=True, read_only=True)
+    submissions = ReceivedSubmissionSerializer(many=True, read_only=True)
 
     class Meta(TopicSerializer.Meta):
         fields = TopicSerializer.Meta.fields + ('submissions',)
@@ -91,4 +121,35 @@ class TopicSubmissionCreateSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = TopicSubmission
-        fields = ('topic_id', 'student_vision')
\ No newline at end of file
+        fields = ('topic_id', 'student_vision')
+
+class SubmissionDecisionSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    decision = serializers.ChoiceField(choices=('approve', 'reject'))
+
+
+class SubmissionDecisionsSerializer(serializers.Serializer):
+    decisions = SubmissionDecisionSerializer(many=True, allow_empty=False, max_length=200)
+
+    def validate_decisions(self, decisions):
+        ids = [decision['id'] for decision in decisions]
+        if len(ids) != len(set(ids)):
+            raise serializers.ValidationError("Each submission can only be decided once per request.")
+        return decisions
+
+
+class TopicBulkItemSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Topic
+        fields = ('title', 'description')
+
+
+class TopicBulkCreateSerializer(serializers.Serializer):
+    stream_id = serializers.IntegerField()
+    topics = TopicBulkItemSerializer(many=True, allow_empty=False, max_length=200)
+
+
+class StreamStatsSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = StreamStats
+        fields = ('stream', 'available_topics', 'taken_topics', 'pending_submissions', 'approved_submissions', 'rejected_submissions')
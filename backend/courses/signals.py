@@ -0,0 +1,53 @@
+from django.conf import settings
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from .caching import bump_stream_version
+from .membership import Membership, invalidate
+from .models import CourseStream, StreamStats, Topic
+from .search import ensure_search_index
+
+
+@receiver(m2m_changed, sender=Membership)
+def invalidate_changed_memberships(sender, instance, action, reverse, pk_set, **kwargs):
+    if reverse:
+        if action in ("post_add", "post_remove", "post_clear"):
+            invalidate([instance.pk])
+    elif action == "pre_clear":
+        instance._cleared_user_ids = list(instance.users.values_list("pk", flat=True))
+    elif action == "post_clear":
+        invalidate(getattr(instance, "_cleared_user_ids", []))
+    elif action in ("post_add", "post_remove"):
+        invalidate(pk_set)
+
+
+@receiver(pre_delete, sender=CourseStream)
+def invalidate_deleted_stream_memberships(sender, instance, **kwargs):
+    invalidate(instance.users.values_list("pk", flat=True))
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def invalidate_new_user_memberships(sender, instance, created, **kwargs):
+    if created:
+        invalidate([instance.pk])
+
+
+@receiver(post_save, sender=Topic)
+@receiver(post_delete, sender=Topic)
+def bump_topic_stream_version(sender, instance, **kwargs):
+    bump_stream_version(instance.stream_id)
+
+
+@receiver(post_save, sender=CourseStream)
+def bump_saved_stream_version(sender, instance, **kwargs):
+    bump_stream_version(instance.pk)
+
+
+@receiver(post_save, sender=CourseStream)
+def create_stream_stats(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        StreamStats.objects.create(stream=instance)
+
+
+def restore_search_index(sender, using, **kwargs):
+    # Connected to post_migrate in CoursesConfig.ready.
+    ensure_search_index(using)
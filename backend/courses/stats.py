@@ -0,0 +1,77 @@
+from django.db import transaction
+from django.db.models import Case, Count, F, Value, When
+from .models import CourseStream, StreamStats, Topic, TopicSubmission
+
+
+BATCH_SIZE = 1000
+TOPIC_FIELDS = {
+    Topic.TopicStatus.AVAILABLE: "available_topics",
+    Topic.TopicStatus.TAKEN: "taken_topics",
+}
+SUBMISSION_FIELDS = {
+    TopicSubmission.SubmissionStatus.PENDING: "pending_submissions",
+    TopicSubmission.SubmissionStatus.APPROVED: "approved_submissions",
+    TopicSubmission.SubmissionStatus.REJECTED: "rejected_submissions",
+}
+COUNTER_FIELDS = tuple(TOPIC_FIELDS.values()) + tuple(SUBMISSION_FIELDS.values())
+
+
+def adjust_many(deltas_by_stream):
+    # Call inside the transaction that changes the rows, so the counters commit or roll back with them.
+    deltas_by_stream = {
+        stream_id: {name: delta for name, delta in deltas.items() if delta}
+        for stream_id, deltas in deltas_by_stream.items()
+    }
+    deltas_by_stream = {stream_id: deltas for stream_id, deltas in deltas_by_stream.items() if deltas}
+    if not deltas_by_stream:
+        return
+
+    updates = {}
+    for name in COUNTER_FIELDS:
+        cases = [When(stream_id=stream_id, then=Value(deltas[name])) for stream_id, deltas in deltas_by_stream.items() if name in deltas]
+        if cases:
+            updates[name] = F(name) + Case(*cases, default=Value(0))
+    updated = StreamStats.objects.filter(stream_id__in=deltas_by_stream).update(**updates)
+    if updated < len(deltas_by_stream):
+        # A stream without a stats row (e.g. created with bulk_create) is counted from scratch, which already includes this change.
+        existing = set(StreamStats.objects.filter(stream_id__in=deltas_by_stream).values_list("stream_id", flat=True))
+        rebuild_stream_stats([stream_id for stream_id in deltas_by_stream if stream_id not in existing])
+
+
+def adjust_stream_stats(stream_id, **deltas):
+    adjust_many({stream_id: deltas})
+
+
+def compute_stream_stats(stream_ids=None):
+    streams = CourseStream.objects.all() if stream_ids is None else CourseStream.objects.filter(id__in=stream_ids)
+    stats = {stream_id: dict.fromkeys(COUNTER_FIELDS, 0) for stream_id in streams.values_list("id", flat=True)}
+
+    for model, fields in ((Topic, TOPIC_FIELDS), (TopicSubmission, SUBMISSION_FIELDS)):
+        rows = model.objects.all() if stream_ids is None else model.objects.filter(stream_id__in=stream_ids)
+        grouped = rows.order_by().values("stream_id", "status").annotate(count=Count("id")).values_list("stream_id", "status", "count")
+        for stream_id, status, count in grouped:
+            stats[stream_id][fields[status]] = count
+    return stats
+
+
+def find_drift(stream_ids=None):
+    stored = StreamStats.objects.all() if stream_ids is None else StreamStats.objects.filter(stream_id__in=stream_ids)
+    stored = {row.pop("stream_id"): row for row in stored.values("stream_id", *COUNTER_FIELDS)}
+    return {
+        stream_id: (stored.get(stream_id), expected)
+        for stream_id, expected in compute_stream_stats(stream_ids).items()
+        if stored.get(stream_id) != expected
+    }
+
+
+def rebuild_stream_stats(stream_ids=None):
+    with transaction.atomic():
+        drift = find_drift(stream_ids)
+        StreamStats.objects.bulk_create(
+            [StreamStats(stream_id=stream_id, **expected) for stream_id, (_, expected) in drift.items()],
+            update_conflicts=True,
+            unique_fields=["stream"],
+            update_fields=COUNTER_FIELDS,
+            batch_size=BATCH_SIZE,
+        )
+    return drift
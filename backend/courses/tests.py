@@ -1,10 +1,43 @@
-from django.test import TestCase
+from datetime import timedelta
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, TransactionTestCase, override_settings
 from django.db.utils import IntegrityError
+from django.core import mail
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.core.management.sql import emit_post_migrate_signal
 from django.core.exceptions import ValidationError
+from django.db import connection, connections
+from django.db.utils import OperationalError
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from asgiref.sync import sync_to_async
+from unittest import mock
+import io
+import os
+import random
+import tempfile
+import threading
 from rest_framework.test import APIClient
 from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.renderers import JSONRenderer
+from core.asgi import application as asgi_application
 from users.models import User
-from .models import Specialty, CourseStream, Topic, TopicSubmission
+from .models import Specialty, CourseStream, Topic, TopicSubmission, OutboxEmail, ImportJob, StreamStats
+from .events import broker
+from .fast_serialization import FastJSONRenderer, serialize_many
+from .mail import queue_account_emails, send_pending_emails
+from .jobs import claim_next_job, run_import_job
+from .membership import is_member
+from .importers import ImportResult, create_users, import_participants, iter_import_batches, read_csv_rows
+from .search import ContainsSearchBackend, SQLiteSearchBackend, TopicSearchBackend, search_terms
+from .stats import find_drift
+from .serializers import MyStreamSerializer, TopicSerializer, TopicSubmissionSerializer, TopicWithSubmissionsSerializer
+from .loadtest import SCENARIOS, run_scenario, select_actors, uncovered_url_names
 
 
 class DatabaseIntegrityTests(TestCase):
@@ -89,6 +122,19 @@ class TeacherSubmissionManagementTests(TestCase):
         self.stream.users.add(self.student1, self.student2)
         self.available_topic = Topic.objects.create(title="Доступна тема", description="Опис", teacher=self.teacher, stream=self.stream)
 
+    def test_moving_a_topic_onto_a_conflicting_submission_is_rejected(self):
+        other_stream = CourseStream.objects.create(name="Потік 2024", specialty=self.specialty, academic_year="2024-2025", semester=1, course_number=4)
+        other_topic = Topic.objects.create(title="Інша тема", description="Опис", teacher=self.teacher, stream=other_stream)
+        TopicSubmission.objects.create(student=self.student1, topic=self.available_topic, status='PENDING')
+        TopicSubmission.objects.create(student=self.student1, topic=other_topic, status='PENDING')
+        self.client.force_authenticate(user=self.teacher)
+
+        response = self.client.put(f'/api/courses/topics/{self.available_topic.id}/', {'stream_id': other_stream.id})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.available_topic.refresh_from_db()
+        self.assertEqual(self.available_topic.stream_id, self.stream.id)
+
     def test_teacher_can_approve_submission(self):
         submission1 = TopicSubmission.objects.create(student=self.student1, topic=self.available_topic, status='PENDING')
         submission2 = TopicSubmission.objects.create(student=self.student2, topic=self.available_topic, status='PENDING')
@@ -110,4 +156,1103 @@ class TeacherSubmissionManagementTests(TestCase):
         submission.refresh_from_db()
         self.available_topic.refresh_from_db()
         self.assertEqual(submission.status, 'REJECTED')
-        self.assertEqual(self.available_topic.status, 'AVAILABLE')
\ No newline at end of file
+        self.assertEqual(self.available_topic.status, 'AVAILABLE')
+
+@override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+class ParticipantImportTests(TestCase):
+    def setUp(self):
+        self.specialty = Specialty.objects.create(code="121", name="Інженерія програмного забезпечення")
+        self.stream = CourseStream.objects.create(name="Потік 2023", specialty=self.specialty, academic_year="2023-2024", semester=1, course_number=4)
+        self.existing = User.objects.create_user(email="existing@test.com", password="password123", first_name="Existing", last_name="User", middle_name="M", role='STUDENT')
+
+    def make_rows(self, count):
+        rows = [{"email": "existing@test.com"}, {"email": "incomplete@test.com", "first_name": "No", "role": "student"}]
+        for i in range(count):
+            rows.append({"email": f"student{i}@test.com", "first_name": "Student", "last_name": str(i), "middle_name": "M", "role": "student"})
+        return rows
+
+    def test_import_creates_users_and_memberships(self):
+        result = import_participants(self.stream, self.make_rows(3))
+        self.assertEqual(result.created_count, 3)
+        self.assertEqual(result.added_count, 4)
+        self.assertEqual(len(result.warnings), 1)
+        self.assertEqual(self.stream.users.count(), 4)
+        self.assertEqual(User.objects.get(email="student0@test.com").role, 'STUDENT')
+        student = User.objects.get(email="student0@test.com")
+        self.assertFalse(student.has_usable_password())
+        self.assertEqual(OutboxEmail.objects.get(recipient="student0@test.com").body, "")
+        send_pending_emails()
+        body = next(message.body for message in mail.outbox if message.to == ["student0@test.com"])
+        uid, token = body.rstrip("/").split("/")[-2:]
+        response = APIClient().post("/api/auth/password/reset/confirm/", {
+            "uid": uid, "token": token, "new_password1": "N3w-passw0rd!", "new_password2": "N3w-passw0rd!",
+        })
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        student.refresh_from_db()
+        self.assertTrue(student.check_password("N3w-passw0rd!"))
+
+    def test_users_created_by_a_concurrent_import_are_reused(self):
+        # Simulates another worker inserting "race@test.com" and taking the username "fresh" after this import's lookup.
+        other = User.objects.create_user(email="race@test.com", first_name="Race", last_name="User", middle_name="M", role='STUDENT')
+        User.objects.create_user(email="taken@test.com", username="fresh", first_name="Taken", last_name="User", middle_name="M")
+        defaults = {"first_name": "New", "last_name": "User", "middle_name": "M", "role": "STUDENT"}
+        user_ids = {}
+        result = ImportResult()
+
+        with mock.patch("users.models.CustomUserManager.allocate_usernames", side_effect=[["race_1", "fresh"], ["fresh_1"]]):
+            create_users({"race@test.com": defaults, "fresh@test.com": defaults}, user_ids, result)
+
+        self.assertEqual(user_ids["race@test.com"], other.pk)
+        self.assertEqual(User.objects.get(pk=user_ids["fresh@test.com"]).username, "fresh_1")
+        self.assertEqual(result.created_count, 1)
+        self.assertEqual(list(OutboxEmail.objects.values_list("recipient", flat=True)), ["fresh@test.com"])
+
+    def test_import_is_idempotent(self):
+        import_participants(self.stream, self.make_rows(3))
+        result = import_participants(self.stream, self.make_rows(3))
+        self.assertEqual(result.created_count, 0)
+        self.assertEqual(OutboxEmail.objects.count(), 3)
+        self.assertEqual(result.added_count, 0)
+
+    def test_import_query_count_does_not_grow_with_rows(self):
+        with CaptureQueriesContext(connection) as small:
+            import_participants(self.stream, self.make_rows(5))
+        other_stream = CourseStream.objects.create(name="Потік 2024", specialty=self.specialty, academic_year="2024-2025", semester=1, course_number=4)
+        rows = [{**row, "email": row["email"].replace("@", "_big@")} for row in self.make_rows(50)]
+        with CaptureQueriesContext(connection) as large:
+            import_participants(other_stream, rows)
+        self.assertEqual(len(small.captured_queries), len(large.captured_queries))
+
+    def test_csv_rows_are_decoded_across_chunk_boundaries(self):
+        content = 'email,last_name,first_name,middle_name,role\r\nшевченко@test.com,Шевченко,"Яна\r\nВолодимирівна",В,STUDENT\r\n'.encode("utf-8")
+        for chunk_size in (1, 2, 3, 7, len(content)):
+            rows = list(read_csv_rows(SimpleUploadedFile("import.csv", content), chunk_size=chunk_size))
+            self.assertEqual(rows, [{"email": "шевченко@test.com", "last_name": "Шевченко", "first_name": "Яна\r\nВолодимирівна", "middle_name": "В", "role": "STUDENT"}])
+
+    def test_csv_rows_keep_unicode_line_separators_inside_fields(self):
+        content = "email,first_name,role\ra@test.com,Ann\x0cX\u2028Y\x85Z,STUDENT\rb@test.com,Bob,STUDENT".encode("utf-8")
+        for chunk_size in (1, 5, len(content)):
+            rows = list(read_csv_rows(SimpleUploadedFile("import.csv", content), chunk_size=chunk_size))
+            self.assertEqual([row["first_name"] for row in rows], ["Ann\x0cX\u2028Y\x85Z", "Bob"])
+
+    def test_import_batches_commit_and_report_progress(self):
+        lines = ["email,last_name,first_name,middle_name,role"]
+        lines += [f"student{i}@test.com,{i},Student,M,STUDENT" for i in range(5)]
+        upload = SimpleUploadedFile("import.csv", "\n".join(lines).encode("utf-8"))
+        results = list(iter_import_batches(self.stream, upload, batch_size=2))
+        self.assertEqual([result.processed_count for result in results], [2, 2, 1])
+        self.assertEqual(sum(result.added_count for result in results), 5)
+        self.assertEqual(self.stream.users.count(), 5)
+
+    def test_multi_file_command_dedupes_users_across_streams(self):
+        other_stream = CourseStream.objects.create(name="Потік 2024", specialty=self.specialty, academic_year="2024-2025", semester=1, course_number=4)
+        header = "email,last_name,first_name,middle_name,role\n"
+        shared = "shared@test.com,Shared,Student,M,STUDENT\n"
+        directory = tempfile.mkdtemp()
+        first_path = os.path.join(directory, "first.csv")
+        second_path = os.path.join(directory, "second.csv")
+        with open(first_path, "w", encoding="utf-8") as file:
+            file.write(header + shared + "existing@test.com,,,,\n")
+        with open(second_path, "w", encoding="utf-8") as file:
+            file.write(header + shared + "only@test.com,Only,Student,M,STUDENT\n")
+
+        output = io.StringIO()
+        call_command("import_participants", f"{first_path}={self.stream.pk}", f"{second_path}={other_stream.pk}", "--workers=2", stdout=output)
+
+        self.assertEqual(User.objects.filter(email="shared@test.com").count(), 1)
+        self.assertEqual(set(self.stream.users.values_list("email", flat=True)), {"shared@test.com", "existing@test.com"})
+        self.assertEqual(set(other_stream.users.values_list("email", flat=True)), {"shared@test.com", "only@test.com"})
+        self.assertIn("2 users created, 4 memberships added", output.getvalue())
+
+
+class OutboxEmailTests(TestCase):
+    def setUp(self):
+        self.first = OutboxEmail.objects.create(recipient="first@test.com", subject="Subject", body="Body")
+        self.second = OutboxEmail.objects.create(recipient="second@test.com", subject="Subject", body="Body")
+
+    def test_pending_emails_are_sent_and_cleared(self):
+        send_pending_emails()
+        self.assertEqual(len(mail.outbox), 2)
+        self.first.refresh_from_db()
+        self.assertEqual(self.first.status, OutboxEmail.EmailStatus.SENT)
+        self.assertEqual(self.first.body, "")
+        self.assertIsNotNone(self.first.sent_at)
+
+    def test_failed_emails_are_retried_until_max_attempts(self):
+        with mock.patch("courses.mail.EmailMessage.send", side_effect=OSError("SMTP is down")):
+            send_pending_emails(max_attempts=2)
+            self.first.refresh_from_db()
+            self.assertEqual(self.first.status, OutboxEmail.EmailStatus.PENDING)
+            self.assertEqual(self.first.last_error, "SMTP is down")
+            send_pending_emails(max_attempts=2)
+        self.first.refresh_from_db()
+        self.assertEqual(self.first.status, OutboxEmail.EmailStatus.FAILED)
+        self.assertEqual(self.first.attempts, 2)
+
+    def test_admin_retry_resends_account_emails_with_a_fresh_link(self):
+        student = User.objects.create_user(email="student@test.com", first_name="Student", last_name="One", role='STUDENT')
+        OutboxEmail.objects.all().delete()
+        queue_account_emails([student])
+        email = OutboxEmail.objects.get()
+        with mock.patch("courses.mail.EmailMessage.send", side_effect=OSError("SMTP is down")):
+            send_pending_emails(max_attempts=1)
+        email.refresh_from_db()
+        self.assertEqual(email.status, OutboxEmail.EmailStatus.FAILED)
+        self.assertEqual(email.body, "")
+
+        admin = User.objects.create_superuser(email="admin@test.com", password="password123", first_name="Admin", last_name="User")
+        self.client.force_login(admin)
+        self.client.post("/admin/courses/outboxemail/", {"action": "retry_emails", "_selected_action": [email.pk]})
+        send_pending_emails()
+
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn("Login: student@test.com", mail.outbox[0].body)
+        self.assertIn("/set-password/", mail.outbox[0].body)
+
+
+@override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"], MEDIA_ROOT=tempfile.mkdtemp())
+class ImportJobTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(email="admin@test.com", password="password123", first_name="Admin", last_name="User")
+        self.specialty = Specialty.objects.create(code="121", name="Інженерія програмного забезпечення")
+        self.stream = CourseStream.objects.create(name="Потік 2023", specialty=self.specialty, academic_year="2023-2024", semester=1, course_number=4)
+        self.client.force_login(self.admin)
+
+    def test_upload_is_queued_and_processed_by_worker(self):
+        content = "email,last_name,first_name,middle_name,role\nstudent@test.com,One,Student,M,STUDENT\nnoname@test.com,,,,\n"
+        response = self.client.post(
+            f"/admin/courses/coursestream/{self.stream.pk}/import/",
+            {"file": SimpleUploadedFile("import.csv", content.encode("utf-8"))},
+        )
+        job = ImportJob.objects.get()
+        self.assertRedirects(response, f"/admin/courses/coursestream/{self.stream.pk}/import/?job={job.pk}")
+        self.assertEqual(job.status, ImportJob.JobStatus.QUEUED)
+        self.assertFalse(self.stream.users.exists())
+
+        run_import_job(claim_next_job())
+        self.assertIsNone(claim_next_job())
+
+        response = self.client.get(f"/admin/courses/coursestream/{self.stream.pk}/import/jobs/{job.pk}/")
+        self.assertEqual(response.json()["status"], "DONE")
+        self.assertEqual(response.json()["rows_processed"], 2)
+        self.assertEqual(response.json()["rows_created"], 1)
+        self.assertEqual(response.json()["rows_added"], 1)
+        self.assertEqual(response.json()["rows_skipped"], 1)
+        self.assertEqual(len(response.json()["errors"]), 1)
+        job.refresh_from_db()
+        self.assertFalse(job.file)
+
+    def test_running_job_is_reclaimed_after_its_lease_expires(self):
+        content = "email,last_name,first_name,middle_name,role\nstudent@test.com,One,Student,M,STUDENT\n"
+        job = ImportJob.objects.create(stream=self.stream, file=SimpleUploadedFile("import.csv", content.encode("utf-8")))
+        path = job.file.path
+        self.assertEqual(claim_next_job().pk, job.pk)
+        self.assertIsNone(claim_next_job())
+
+        ImportJob.objects.filter(pk=job.pk).update(heartbeat_at=timezone.now() - timedelta(seconds=settings.IMPORT_JOB_LEASE + 1))
+        job = run_import_job(claim_next_job())
+        self.assertEqual(job.status, ImportJob.JobStatus.DONE)
+        self.assertEqual(job.rows_added, 1)
+        self.assertFalse(os.path.exists(path))
+
+    def test_admin_action_imports_files_for_selected_streams(self):
+        other_stream = CourseStream.objects.create(name="Потік 2024", specialty=self.specialty, academic_year="2024-2025", semester=1, course_number=4)
+        selected = {"action": "import_participants_for_streams", "_selected_action": [self.stream.pk, other_stream.pk]}
+        response = self.client.post("/admin/courses/coursestream/", selected)
+        self.assertContains(response, f'name="file_{other_stream.pk}"')
+
+        content = "email,last_name,first_name,middle_name,role\nstudent@test.com,One,Student,M,STUDENT\n".encode("utf-8")
+        response = self.client.post("/admin/courses/coursestream/", {
+            **selected,
+            "apply": "1",
+            f"file_{self.stream.pk}": SimpleUploadedFile("first.csv", content),
+            f"file_{other_stream.pk}": SimpleUploadedFile("second.csv", content),
+        })
+        self.assertRedirects(response, "/admin/courses/importjob/")
+        self.assertEqual(set(ImportJob.objects.values_list("stream_id", "status")), {
+            (self.stream.pk, ImportJob.JobStatus.QUEUED), (other_stream.pk, ImportJob.JobStatus.QUEUED),
+        })
+        self.assertFalse(User.objects.filter(email="student@test.com").exists())
+
+        while (job := claim_next_job()) is not None:
+            run_import_job(job)
+        self.assertEqual(User.objects.filter(email="student@test.com").count(), 1)
+        self.assertEqual(CourseStream.users.through.objects.filter(user__email="student@test.com").count(), 2)
+
+
+class QueryCountTestMixin:
+    def assertConstantQueries(self, url, grow, user, sizes=(1, 5, 20)):
+        self.client.force_authenticate(user=user)
+        self.client.get(url)
+        counts = []
+        for size in sizes:
+            grow(size)
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            counts.append(len(context.captured_queries))
+        self.assertEqual(len(set(counts)), 1, f"Query count for {url} grows with data: {counts}")
+
+
+@override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+class ListQueryCountTests(QueryCountTestMixin, TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.specialty = Specialty.objects.create(code="121", name="Інженерія програмного забезпечення")
+        self.stream = CourseStream.objects.create(name="Потік 2023", specialty=self.specialty, academic_year="2023-2024", semester=1, course_number=4)
+        self.teacher = User.objects.create_user(email="teacher@test.com", password="password123", first_name="Test", last_name="Teacher", role='TEACHER')
+        self.student = User.objects.create_user(email="student@test.com", password="password123", first_name="Student", last_name="One", role='STUDENT')
+        self.stream.users.add(self.teacher, self.student)
+
+    def create_topics(self, count):
+        for _ in range(count):
+            teacher = User.objects.create_user(email=f"teacher{User.objects.count()}@test.com", password="password123", first_name="T", last_name="T", role='TEACHER')
+            Topic.objects.create(title="Тема", description="Опис", teacher=teacher, stream=self.stream)
+
+    def create_own_topics(self, count):
+        for _ in range(count):
+            stream = CourseStream.objects.create(name="Потік", specialty=self.specialty, academic_year="2023-2024", semester=1, course_number=4)
+            Topic.objects.create(title="Тема", description="Опис", teacher=self.teacher, stream=stream)
+
+    def create_submissions(self, count):
+        for _ in range(count):
+            stream = CourseStream.objects.create(name="Потік", specialty=self.specialty, academic_year="2023-2024", semester=1, course_number=4)
+            topic = Topic.objects.create(title="Тема", description="Опис", teacher=self.teacher, stream=stream)
+            TopicSubmission.objects.create(student=self.student, topic=topic, student_vision="Vision")
+
+    def test_stream_topics_query_count_is_constant(self):
+        self.assertConstantQueries(f'/api/courses/streams/{self.stream.id}/topics/', self.create_topics, self.student)
+
+    def test_my_topics_query_count_is_constant(self):
+        self.assertConstantQueries('/api/courses/topics/my/', self.create_own_topics, self.teacher)
+
+    def test_my_submissions_query_count_is_constant(self):
+        self.assertConstantQueries('/api/courses/submissions/my/', self.create_submissions, self.student)
+
+    def create_received_submissions(self, count):
+        for _ in range(count):
+            student = User.objects.create_user(email=f"student{User.objects.count()}@test.com", password="password123", first_name="S", last_name="S", role='STUDENT')
+            stream = CourseStream.objects.create(name="Потік", specialty=self.specialty, academic_year="2023-2024", semester=1, course_number=4)
+            topic = Topic.objects.create(title="Тема", description="Опис", teacher=self.teacher, stream=stream)
+            TopicSubmission.objects.create(student=student, topic=topic, student_vision="Vision")
+            TopicSubmission.objects.create(student=self.student, topic=topic, student_vision="Vision")
+
+    def test_received_submissions_query_count_is_constant(self):
+        self.assertConstantQueries('/api/courses/submissions/received/', self.create_received_submissions, self.teacher)
+
+    def test_received_submissions_do_not_embed_the_topic_again(self):
+        self.create_received_submissions(1)
+        self.client.force_authenticate(user=self.teacher)
+        response = self.client.get('/api/courses/submissions/received/')
+        submission = response.data['results'][0]['submissions'][0]
+        self.assertNotIn('topic', submission)
+        self.assertEqual(submission['student']['email'], 'student@test.com')
+
+    def test_list_endpoints_are_paginated_with_cursors(self):
+        self.create_submissions(5)
+        self.client.force_authenticate(user=self.student)
+        url = '/api/courses/submissions/my/?page_size=2'
+        seen = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertLessEqual(len(response.data['results']), 2)
+            seen.extend(submission['id'] for submission in response.data['results'])
+            url = response.data['next']
+        expected = list(TopicSubmission.objects.filter(student=self.student).order_by('-created_at', '-id').values_list('id', flat=True))
+        self.assertEqual(seen, expected)
+
+    def test_received_submissions_are_paginated_by_latest_submission(self):
+        self.create_received_submissions(3)
+        self.client.force_authenticate(user=self.teacher)
+        first_page = self.client.get('/api/courses/submissions/received/?page_size=2')
+        second_page = self.client.get(first_page.data['next'])
+        ids = [topic['id'] for topic in first_page.data['results'] + second_page.data['results']]
+        self.assertEqual(len(ids), 3)
+        self.assertEqual(len(set(ids)), 3)
+        self.assertIsNone(second_page.data['next'])
+
+
+@override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+class ConcurrentClaimTests(TransactionTestCase):
+    THREADS = 8
+
+    def setUp(self):
+        if connection.vendor == "sqlite" and connection.is_in_memory_db():
+            self.skipTest("Threads cannot open separate connections to an in-memory SQLite database")
+        self.specialty = Specialty.objects.create(code="121", name="Інженерія програмного забезпечення")
+        self.stream = CourseStream.objects.create(name="Потік 2023", specialty=self.specialty, academic_year="2023-2024", semester=1, course_number=4)
+        self.teacher = User.objects.create_user(email="teacher@test.com", password="password123", first_name="Test", last_name="Teacher", role='TEACHER')
+        self.topics = [
+            Topic.objects.create(title=f"Тема {i}", description="Опис", teacher=self.teacher, stream=self.stream)
+            for i in range(self.THREADS)
+        ]
+
+    def run_concurrently(self, requests):
+        barrier = threading.Barrier(len(requests))
+        status_codes = []
+
+        def worker(user, url, data):
+            client = APIClient()
+            client.force_authenticate(user=user)
+            barrier.wait()
+            try:
+                status_codes.append(client.post(url, data).status_code)
+            except OperationalError:
+                status_codes.append(None)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=worker, args=request) for request in requests]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return status_codes
+
+    def test_concurrent_submissions_create_one_active_submission_per_stream(self):
+        student = User.objects.create_user(email="student@test.com", password="password123", first_name="Student", last_name="One", role='STUDENT')
+        status_codes = self.run_concurrently([
+            (student, '/api/courses/submissions/', {'topic_id': topic.id, 'student_vision': 'My vision'})
+            for topic in self.topics
+        ])
+        self.assertEqual(sorted(status_codes), [status.HTTP_201_CREATED] + [status.HTTP_400_BAD_REQUEST] * (self.THREADS - 1))
+        self.assertEqual(TopicSubmission.objects.filter(student=student, status__in=['PENDING', 'APPROVED']).count(), 1)
+
+    def test_concurrent_approvals_take_a_topic_once(self):
+        topic = self.topics[0]
+        submissions = []
+        for i in range(self.THREADS):
+            student = User.objects.create_user(email=f"student{i}@test.com", password="password123", first_name="Student", last_name=str(i), role='STUDENT')
+            submissions.append(TopicSubmission.objects.create(student=student, topic=topic, student_vision="Vision"))
+        status_codes = self.run_concurrently([
+            (self.teacher, f'/api/courses/submissions/{submission.id}/approve/', {})
+            for submission in submissions
+        ])
+        self.assertEqual(sorted(status_codes), [status.HTTP_200_OK] + [status.HTTP_400_BAD_REQUEST] * (self.THREADS - 1))
+        self.assertEqual(TopicSubmission.objects.filter(topic=topic, status='APPROVED').count(), 1)
+
+    def test_database_rejects_a_second_active_submission(self):
+        student = User.objects.create_user(email="student@test.com", password="password123", first_name="Student", last_name="One", role='STUDENT')
+        TopicSubmission.objects.create(student=student, topic=self.topics[0])
+        with self.assertRaises(IntegrityError):
+            TopicSubmission.objects.create(student=student, topic=self.topics[1])
+
+
+@override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+class StreamMembershipTests(TestCase):
+    def setUp(self):
+        self.specialty = Specialty.objects.create(code="121", name="Інженерія програмного забезпечення")
+        self.stream = CourseStream.objects.create(name="Потік 2023", specialty=self.specialty, academic_year="2023-2024", semester=1, course_number=4)
+        self.student = User.objects.create_user(email="student@test.com", password="password123", first_name="Student", last_name="One", role='STUDENT')
+
+    def test_membership_is_cached_per_user(self):
+        self.stream.users.add(self.student)
+        self.assertTrue(is_member(self.student, self.stream))
+        with self.assertNumQueries(0):
+            self.assertTrue(is_member(self.student, self.stream))
+            self.assertFalse(is_member(self.student, self.stream.pk + 1))
+
+    def test_cache_is_invalidated_on_membership_changes(self):
+        self.assertFalse(is_member(self.student, self.stream))
+        self.stream.users.add(self.student)
+        self.assertTrue(is_member(self.student, self.stream))
+        self.student.streams.remove(self.stream)
+        self.assertFalse(is_member(self.student, self.stream))
+        self.student.streams.add(self.stream)
+        self.assertTrue(is_member(self.student, self.stream))
+        self.stream.users.clear()
+        self.assertFalse(is_member(self.student, self.stream))
+
+    def test_cache_is_invalidated_by_bulk_import(self):
+        self.assertFalse(is_member(self.student, self.stream))
+        import_participants(self.stream, [{"email": "student@test.com"}])
+        self.assertTrue(is_member(self.student, self.stream))
+
+    def test_cache_is_invalidated_again_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            import_participants(self.stream, [{"email": "student@test.com"}])
+            # A concurrent reader that does not see the import yet caches the old memberships.
+            cache.set(f"courses:stream-ids:{self.student.pk}", frozenset())
+        self.assertTrue(is_member(self.student, self.stream))
+
+
+@override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+class StreamTopicsCacheTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.specialty = Specialty.objects.create(code="121", name="Інженерія програмного забезпечення")
+        self.stream = CourseStream.objects.create(name="Потік 2023", specialty=self.specialty, academic_year="2023-2024", semester=1, course_number=4)
+        self.teacher = User.objects.create_user(email="teacher@test.com", password="password123", first_name="Test", last_name="Teacher", role='TEACHER')
+        self.student = User.objects.create_user(email="student@test.com", password="password123", first_name="Student", last_name="One", role='STUDENT')
+        self.stream.users.add(self.teacher, self.student)
+        self.topic = Topic.objects.create(title="Тема", description="Опис", teacher=self.teacher, stream=self.stream)
+        self.url = f'/api/courses/streams/{self.stream.id}/topics/'
+        self.client.force_authenticate(user=self.student)
+
+    def test_repeated_requests_are_served_from_cache(self):
+        first = self.client.get(self.url)
+        with self.assertNumQueries(0):
+            second = self.client.get(self.url)
+        self.assertEqual(first.content, second.content)
+        self.assertEqual(second.json()['results'][0]['title'], "Тема")
+
+    def test_unchanged_list_returns_not_modified(self):
+        etag = self.client.get(self.url)['ETag']
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b"")
+
+    def test_topic_changes_invalidate_the_cache(self):
+        etag = self.client.get(self.url)['ETag']
+        Topic.objects.create(title="Нова тема", description="Опис", teacher=self.teacher, stream=self.stream)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.json()['results']), 2)
+
+    def test_approval_invalidates_the_cache(self):
+        self.client.get(self.url)
+        submission = TopicSubmission.objects.create(student=self.student, topic=self.topic, student_vision="Vision")
+        self.client.force_authenticate(user=self.teacher)
+        self.client.post(f'/api/courses/submissions/{submission.id}/approve/')
+        self.client.force_authenticate(user=self.student)
+        self.assertEqual(self.client.get(self.url).json()['results'], [])
+
+    def test_non_members_are_not_served_cached_lists(self):
+        self.client.get(self.url)
+        outsider = User.objects.create_user(email="outsider@test.com", password="password123", first_name="Out", last_name="Sider", role='STUDENT')
+        self.client.force_authenticate(user=outsider)
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(self.client.get('/api/courses/streams/999/topics/').status_code, status.HTTP_404_NOT_FOUND)
+
+
+@override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"], ROOT_URLCONF="core.asgi_urls")
+class TopicEventStreamTests(TestCase):
+    def setUp(self):
+        self.specialty = Specialty.objects.create(code="121", name="Інженерія програмного забезпечення")
+        self.stream = CourseStream.objects.create(name="Потік 2023", specialty=self.specialty, academic_year="2023-2024", semester=1, course_number=4)
+        self.teacher = User.objects.create_user(email="teacher@test.com", password="password123", first_name="Test", last_name="Teacher", role='TEACHER')
+        self.student = User.objects.create_user(email="student@test.com", password="password123", first_name="Student", last_name="One", role='STUDENT')
+        self.stream.users.add(self.teacher, self.student)
+        self.topic = Topic.objects.create(title="Тема", description="Опис", teacher=self.teacher, stream=self.stream)
+        self.token = Token.objects.create(user=self.student)
+        self.url = f'/api/courses/streams/{self.stream.id}/events/'
+
+    def get_ticket(self, user=None):
+        client = APIClient()
+        client.force_authenticate(user=user or self.student)
+        return client.post(f"{self.url}ticket/")
+
+    @override_settings(ROOT_URLCONF="core.urls")
+    def test_is_not_routed_under_wsgi(self):
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_asgi_application_routes_the_event_stream(self):
+        request, _ = asgi_application.create_request({"type": "http", "method": "GET", "path": self.url, "headers": []}, io.BytesIO())
+        self.assertEqual(request.urlconf, "core.asgi_urls")
+
+    def test_requires_a_valid_ticket(self):
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(self.client.get(self.url, {"ticket": "invalid"}).status_code, status.HTTP_401_UNAUTHORIZED)
+        # The long-lived auth token is never accepted in the query string.
+        self.assertEqual(self.client.get(self.url, {"token": self.token.key}).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_tickets_expire_and_are_bound_to_a_stream(self):
+        ticket = self.get_ticket().json()["ticket"]
+        other_stream = CourseStream.objects.create(name="Потік 2024", specialty=self.specialty, academic_year="2024-2025", semester=1, course_number=4)
+        response = self.client.get(f'/api/courses/streams/{other_stream.id}/events/', {"ticket": ticket})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        with mock.patch("courses.events.TICKET_MAX_AGE", -1):
+            self.assertEqual(self.client.get(self.url, {"ticket": ticket}).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_rejects_students_outside_the_stream(self):
+        ticket = self.get_ticket().json()["ticket"]
+        self.stream.users.remove(self.student)
+        self.assertEqual(self.get_ticket().status_code, status.HTTP_403_FORBIDDEN)
+        response = self.client.get(self.url, {"ticket": ticket})
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    async def test_streams_published_events(self):
+        ticket = (await sync_to_async(self.get_ticket)()).json()["ticket"]
+        response = await self.async_client.get(self.url, {"ticket": ticket})
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+
+        content = response.streaming_content
+        self.assertTrue((await anext(content)).startswith(b"retry:"))
+        broker.publish(self.stream.id, {"type": "topic.status", "data": {"id": self.topic.id, "status": "TAKEN"}})
+        chunk = await anext(content)
+        await content.aclose()
+        response.close()
+
+        self.assertEqual(chunk, f'event: topic.status\ndata: {{"id": {self.topic.id}, "status": "TAKEN"}}\n\n'.encode())
+        self.assertFalse(broker.has_subscribers(self.stream.id))
+
+    def test_approval_publishes_taken_status_after_commit(self):
+        submission = TopicSubmission.objects.create(student=self.student, topic=self.topic, student_vision="Vision")
+        client = APIClient()
+        client.force_authenticate(user=self.teacher)
+
+        with mock.patch.object(broker, "has_subscribers", return_value=True), mock.patch.object(broker, "publish") as publish:
+            with self.captureOnCommitCallbacks(execute=True):
+                client.post(f'/api/courses/submissions/{submission.id}/approve/')
+
+        publish.assert_called_once_with(self.stream.id, {"type": "topic.status", "data": {"id": self.topic.id, "status": "TAKEN"}})
+
+    def test_topic_changes_publish_events(self):
+        client = APIClient()
+        client.force_authenticate(user=self.teacher)
+
+        with mock.patch.object(broker, "has_subscribers", return_value=True), mock.patch.object(broker, "publish") as publish:
+            with self.captureOnCommitCallbacks(execute=True):
+                created = client.post('/api/courses/topics/', {"title": "Нова тема", "description": "Опис", "stream_id": self.stream.id}).json()
+                client.delete(f'/api/courses/topics/{created["id"]}/delete/')
+
+        self.assertEqual(
+            [call.args[1]["type"] for call in publish.call_args_list],
+            ["topic.created", "topic.deleted"],
+        )
+
+
+@override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+class AsyncReadViewTests(TestCase):
+    def setUp(self):
+        self.specialty = Specialty.objects.create(code="121", name="Інженерія програмного забезпечення")
+        self.stream = CourseStream.objects.create(name="Потік 2023", specialty=self.specialty, academic_year="2023-2024", semester=1, course_number=4)
+        self.teacher = User.objects.create_user(email="teacher@test.com", password="password123", first_name="Test", last_name="Teacher", role='TEACHER')
+        self.student = User.objects.create_user(email="student@test.com", password="password123", first_name="Student", last_name="One", role='STUDENT')
+        self.stream.users.add(self.teacher, self.student)
+        topics = [Topic.objects.create(title=f"Тема {number}", description="Опис", teacher=self.teacher, stream=self.stream) for number in range(3)]
+        TopicSubmission.objects.create(student=self.student, topic=topics[0], student_vision="Vision")
+        self.tokens = {user: Token.objects.create(user=user).key for user in (self.teacher, self.student)}
+
+    def get(self, url, user, **params):
+        return self.client.get(url, params, HTTP_AUTHORIZATION=f"Token {self.tokens[user]}")
+
+    def assertSamePages(self, path, user):
+        sync_page = self.get(f'/api/courses/{path}', user, page_size=2).json()
+        async_page = self.get(f'/api/courses/async/{path}', user, page_size=2).json()
+        self.assertEqual(async_page['results'], sync_page['results'])
+        self.assertEqual(bool(async_page['next']), bool(sync_page['next']))
+
+        if sync_page['next']:
+            cursor = sync_page['next'].split('cursor=')[1].split('&')[0]
+            self.assertIn(f'cursor={cursor}', async_page['next'])
+            self.assertEqual(
+                self.get(f'/api/courses/async/{path}', user, page_size=2, cursor=cursor).json()['results'],
+                self.get(f'/api/courses/{path}', user, page_size=2, cursor=cursor).json()['results'],
+            )
+
+    def test_async_views_match_sync_views(self):
+        self.assertSamePages('streams/my/', self.student)
+        self.assertSamePages(f'streams/{self.stream.id}/topics/', self.student)
+        self.assertSamePages('submissions/my/', self.student)
+        self.assertSamePages('topics/my/', self.teacher)
+        self.assertSamePages('submissions/received/', self.teacher)
+
+    def test_requires_token_and_role(self):
+        self.assertEqual(self.client.get('/api/courses/async/streams/my/').status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(self.get('/api/courses/async/topics/my/', self.student).status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(self.get('/api/courses/async/streams/0/topics/', self.student).status_code, status.HTTP_404_NOT_FOUND)
+
+
+@override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"], ALLOWED_HOSTS=["localhost"])
+class LoadTestScenarioTests(TransactionTestCase):
+    def test_scenarios_cover_every_endpoint_without_errors(self):
+        call_command("seed_courses", specialties=1, streams=3, students_per_stream=10, teachers=3, topics_per_stream=5, stdout=io.StringIO())
+
+        rng = random.Random(0)
+        results = [
+            # The shared in-memory test database locks whole tables, so concurrent writers are covered by ConcurrentClaimTests.
+            run_scenario(name, select_actors(name, 5, rng), concurrency=1)
+            for name in SCENARIOS
+        ]
+
+        self.assertEqual(uncovered_url_names(results), [])
+        for result in results:
+            for name, stats in result.summary().items():
+                self.assertEqual(stats["errors"], 0, f"{result.name} {name}")
+
+
+class FastSerializationTests(TestCase):
+    def setUp(self):
+        self.specialty = Specialty.objects.create(code="121", name="Інженерія програмного забезпечення")
+        self.stream = CourseStream.objects.create(name="Потік 2023", specialty=self.specialty, academic_year="2023-2024", semester=1, course_number=4)
+        self.teacher = User.objects.create_user(email="teacher@test.com", password="password123", first_name="Test", last_name="Teacher", role='TEACHER')
+        self.student = User.objects.create_user(email="student@test.com", password="password123", first_name="Student", last_name="One", role='STUDENT')
+        self.topic = Topic.objects.create(title="Тема\u2028\"з\" лапками", description="Опис\n</script>", teacher=self.teacher, stream=self.stream)
+        TopicSubmission.objects.create(student=self.student, topic=self.topic, student_vision="Vision")
+
+    def assertSameOutput(self, serializer_class, instances):
+        self.assertEqual(
+            FastJSONRenderer().render(serialize_many(serializer_class, instances)),
+            JSONRenderer().render(serializer_class(instances, many=True).data),
+        )
+
+    def test_output_matches_drf_serializers(self):
+        self.topic.status = Topic.TopicStatus.TAKEN
+        self.assertSameOutput(TopicSerializer, [self.topic])
+        self.assertSameOutput(MyStreamSerializer, list(CourseStream.objects.all()))
+        self.assertSameOutput(TopicSubmissionSerializer, list(TopicSubmission.objects.all()))
+        self.assertSameOutput(TopicWithSubmissionsSerializer, list(Topic.objects.prefetch_related('submissions')))
+
+    def test_renderer_falls_back_for_types_orjson_cannot_encode(self):
+        data = {"detail": gettext_lazy("Not found.")}
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+
+class SparseFieldsetTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.specialty = Specialty.objects.create(code="121", name="Інженерія програмного забезпечення")
+        self.stream = CourseStream.objects.create(name="Потік 2023", specialty=self.specialty, academic_year="2023-2024", semester=1, course_number=4)
+        self.teacher = User.objects.create_user(email="teacher@test.com", password="password123", first_name="Test", last_name="Teacher", role='TEACHER')
+        self.student = User.objects.create_user(email="student@test.com", password="password123", first_name="Student", last_name="One", role='STUDENT')
+        self.stream.users.add(self.teacher, self.student)
+        self.topic = Topic.objects.create(title="Тема", description="Опис", teacher=self.teacher, stream=self.stream)
+        self.submission = TopicSubmission.objects.create(student=self.student, topic=self.topic, student_vision="Vision")
+        self.client.force_authenticate(user=self.student)
+
+    def get_results(self, url, params):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.json()['results'], " ".join(query['sql'] for query in context.captured_queries)
+
+    def test_fields_limit_the_response_and_the_columns(self):
+        results, sql = self.get_results(f'/api/courses/streams/{self.stream.id}/topics/', {'fields': 'id,title'})
+        self.assertEqual(results, [{'id': self.topic.id, 'title': "Тема"}])
+        self.assertNotIn('"description"', sql)
+        self.assertNotIn('"users_user"', sql)
+
+    def test_unexpanded_relations_are_rendered_as_ids(self):
+        results, sql = self.get_results('/api/courses/submissions/my/', {'fields': 'id,topic,status'})
+        self.assertEqual(results, [{'id': self.submission.id, 'status': "PENDING", 'topic': self.topic.id}])
+        self.assertNotIn('"courses_topic"', sql)
+
+    def test_dotted_fields_and_expand_select_nested_data(self):
+        results, sql = self.get_results('/api/courses/submissions/my/', {'fields': 'id,topic.title,topic.stream', 'expand': 'topic.stream'})
+        self.assertEqual(results[0]['topic']['title'], "Тема")
+        self.assertEqual(results[0]['topic']['stream']['specialty'], {'code': "121", 'name': "Інженерія програмного забезпечення"})
+        self.assertNotIn('"description"', sql)
+
+    def test_expand_alone_keeps_every_field_and_collapses_other_relations(self):
+        self.client.force_authenticate(user=self.teacher)
+        results, _ = self.get_results('/api/courses/submissions/received/', {'expand': 'stream'})
+        topic = results[0]
+        self.assertEqual(topic['teacher'], self.teacher.id)
+        self.assertEqual(topic['stream']['name'], "Потік 2023")
+        self.assertEqual(topic['submissions'], [self.submission.id])
+
+    def test_without_parameters_the_full_payload_is_returned(self):
+        results, _ = self.get_results('/api/courses/submissions/my/', {})
+        self.assertEqual(results[0]['topic']['stream']['specialty']['code'], "121")
+        self.assertEqual(results[0]['topic']['description'], "Опис")
+
+
+@override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+class SubmissionDecisionTests(TestCase):
+    url = '/api/courses/submissions/decide/'
+
+    def setUp(self):
+        self.client = APIClient()
+        self.teacher = User.objects.create_user(email="teacher@test.com", password="password123", first_name="Test", last_name="Teacher", role='TEACHER')
+        self.other_teacher = User.objects.create_user(email="other@test.com", password="password123", first_name="Other", last_name="Teacher", role='TEACHER')
+        self.specialty = Specialty.objects.create(code="121", name="Інженерія програмного забезпечення")
+        self.client.force_authenticate(user=self.teacher)
+
+    def create_topic_with_submissions(self, count, teacher=None):
+        stream = CourseStream.objects.create(name="Потік", specialty=self.specialty, academic_year="2023-2024", semester=1, course_number=4)
+        topic = Topic.objects.create(title="Тема", description="Опис", teacher=teacher or self.teacher, stream=stream)
+        submissions = []
+        for _ in range(count):
+            student = User.objects.create_user(email=f"student{User.objects.count()}@test.com", password="password123", first_name="S", last_name="S", role='STUDENT')
+            submissions.append(TopicSubmission.objects.create(student=student, topic=topic, student_vision="Vision"))
+        return topic, submissions
+
+    def test_decisions_are_applied_together(self):
+        topic, (first, second, third) = self.create_topic_with_submissions(3)
+        other_topic, (rejected,) = self.create_topic_with_submissions(1)
+
+        response = self.client.post(self.url, {"decisions": [
+            {"id": first.id, "decision": "approve"},
+            {"id": rejected.id, "decision": "reject"},
+        ]}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json(), {"approved": [first.id], "rejected": [rejected.id], "auto_rejected": 2, "failed": []})
+        topic.refresh_from_db()
+        other_topic.refresh_from_db()
+        self.assertEqual(topic.status, 'TAKEN')
+        self.assertEqual(other_topic.status, 'AVAILABLE')
+        self.assertEqual(
+            dict(TopicSubmission.objects.values_list('id', 'status')),
+            {first.id: 'APPROVED', second.id: 'REJECTED', third.id: 'REJECTED', rejected.id: 'REJECTED'},
+        )
+
+    def test_conflicting_and_foreign_decisions_are_reported(self):
+        taken, (approved, late) = self.create_topic_with_submissions(2)
+        self.client.post(f'/api/courses/submissions/{approved.id}/approve/')
+        _, (first, second) = self.create_topic_with_submissions(2)
+        _, (foreign,) = self.create_topic_with_submissions(1, teacher=self.other_teacher)
+
+        response = self.client.post(self.url, {"decisions": [
+            {"id": first.id, "decision": "approve"},
+            {"id": second.id, "decision": "approve"},
+            {"id": late.id, "decision": "reject"},
+            {"id": foreign.id, "decision": "approve"},
+        ]}, format='json')
+
+        self.assertEqual(response.json()["approved"], [first.id])
+        self.assertEqual(
+            {item["id"]: item["detail"] for item in response.json()["failed"]},
+            {
+                second.id: "Another submission for this topic is approved in this request.",
+                late.id: "This submission is not pending rejection.",
+                foreign.id: "Not found.",
+            },
+        )
+        foreign.refresh_from_db()
+        self.assertEqual(foreign.status, 'PENDING')
+
+    def test_duplicate_ids_are_rejected(self):
+        _, (submission,) = self.create_topic_with_submissions(1)
+        response = self.client.post(self.url, {"decisions": [
+            {"id": submission.id, "decision": "approve"},
+            {"id": submission.id, "decision": "reject"},
+        ]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_query_count_does_not_grow_with_the_batch(self):
+        def decide(topic_count):
+            decisions = []
+            for _ in range(topic_count):
+                _, (approve, reject) = self.create_topic_with_submissions(2)
+                decisions += [{"id": approve.id, "decision": "approve"}, {"id": reject.id, "decision": "reject"}]
+            with CaptureQueriesContext(connection) as context:
+                self.client.post(self.url, {"decisions": decisions}, format='json')
+            return len(context.captured_queries)
+
+        self.assertEqual(decide(1), decide(10))
+
+
+@override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+class BulkTopicCreationTests(TestCase):
+    url = '/api/courses/topics/bulk/'
+
+    def setUp(self):
+        self.client = APIClient()
+        self.teacher = User.objects.create_user(email="teacher@test.com", password="password123", first_name="Test", last_name="Teacher", role='TEACHER')
+        specialty = Specialty.objects.create(code="121", name="Інженерія програмного забезпечення")
+        self.stream = CourseStream.objects.create(name="Потік", specialty=specialty, academic_year="2023-2024", semester=1, course_number=4)
+        self.other_stream = CourseStream.objects.create(name="Інший потік", specialty=specialty, academic_year="2023-2024", semester=1, course_number=4)
+        self.stream.users.add(self.teacher)
+        self.client.force_authenticate(user=self.teacher)
+
+    def topics(self, count):
+        return [{"title": f"Тема {index}", "description": "Опис"} for index in range(count)]
+
+    def test_topics_are_created_together(self):
+        response = self.client.post(self.url, {"stream_id": self.stream.id, "topics": self.topics(3)}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual([topic["title"] for topic in response.json()], ["Тема 0", "Тема 1", "Тема 2"])
+        self.assertEqual(response.json()[0]["stream"]["id"], self.stream.id)
+        self.assertEqual(Topic.objects.filter(stream=self.stream, teacher=self.teacher, status='AVAILABLE').count(), 3)
+
+    def test_one_invalid_topic_rejects_the_batch(self):
+        topics = self.topics(2) + [{"title": "", "description": "Опис"}]
+        response = self.client.post(self.url, {"stream_id": self.stream.id, "topics": topics}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("title", response.json()["topics"][2])
+        self.assertFalse(Topic.objects.exists())
+
+    def test_stream_membership_is_required(self):
+        response = self.client.post(self.url, {"stream_id": self.other_stream.id, "topics": self.topics(1)}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        response = self.client.post(self.url, {"stream_id": 999, "topics": self.topics(1)}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_query_count_does_not_grow_with_the_batch(self):
+        def create(count):
+            with CaptureQueriesContext(connection) as context:
+                self.client.post(self.url, {"stream_id": self.stream.id, "topics": self.topics(count)}, format='json')
+            return len(context.captured_queries)
+
+        is_member(self.teacher, self.stream)
+        self.assertEqual(create(1), create(40))
+
+    def test_bulk_creation_invalidates_the_topics_cache(self):
+        student = User.objects.create_user(email="student@test.com", password="password123", first_name="Test", last_name="Student", role='STUDENT')
+        self.stream.users.add(student)
+        student_client = APIClient()
+        student_client.force_authenticate(user=student)
+        self.assertEqual(student_client.get(f'/api/courses/streams/{self.stream.id}/topics/').json()["results"], [])
+
+        self.client.post(self.url, {"stream_id": self.stream.id, "topics": self.topics(2)}, format='json')
+
+        self.assertEqual(len(student_client.get(f'/api/courses/streams/{self.stream.id}/topics/').json()["results"]), 2)
+
+    def test_admin_imports_topics_from_csv_and_json(self):
+        admin = User.objects.create_superuser(email="admin@test.com", password="password123", first_name="Admin", last_name="User")
+        self.client.force_login(admin)
+        csv_file = SimpleUploadedFile("topics.csv", "title,description\nТема CSV,Опис\n".encode("utf-8"), content_type="text/csv")
+        json_file = SimpleUploadedFile("topics.json", '[{"title": "Тема JSON", "description": "Опис"}]'.encode("utf-8"), content_type="application/json")
+
+        for file in (csv_file, json_file):
+            response = self.client.post("/admin/courses/topic/import/", {"stream": self.stream.pk, "teacher": self.teacher.pk, "file": file})
+            self.assertRedirects(response, "/admin/courses/topic/")
+
+        self.assertEqual(set(Topic.objects.values_list("title", flat=True)), {"Тема CSV", "Тема JSON"})
+
+    def test_admin_import_reports_invalid_rows(self):
+        admin = User.objects.create_superuser(email="admin@test.com", password="password123", first_name="Admin", last_name="User")
+        self.client.force_login(admin)
+        file = SimpleUploadedFile("topics.json", '[{"title": "Тема", "description": "Опис"}, {"title": "Без опису"}]'.encode("utf-8"))
+
+        response = self.client.post("/admin/courses/topic/import/", {"stream": self.stream.pk, "teacher": self.teacher.pk, "file": file})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Row 2, description")
+        self.assertFalse(Topic.objects.exists())
+
+
+@override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+class StreamStatsTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.teacher = User.objects.create_user(email="teacher@test.com", password="password123", first_name="Test", last_name="Teacher", role='TEACHER')
+        specialty = Specialty.objects.create(code="121", name="Інженерія програмного забезпечення")
+        self.stream = CourseStream.objects.create(name="Потік", specialty=specialty, academic_year="2023-2024", semester=1, course_number=4)
+        self.stream.users.add(self.teacher)
+        self.students = []
+        for index in range(4):
+            student = User.objects.create_user(email=f"student{index}@test.com", password="password123", first_name="S", last_name="S", role='STUDENT')
+            self.stream.users.add(student)
+            self.students.append(student)
+
+    def as_user(self, user):
+        self.client.force_authenticate(user=user)
+        return self.client
+
+    def submit(self, student, topic_id):
+        return self.as_user(student).post('/api/courses/submissions/', {"topic_id": topic_id, "student_vision": "Vision"}, format='json').json()
+
+    def stats(self):
+        return self.as_user(self.teacher).get(f'/api/courses/streams/{self.stream.id}/stats/').json()
+
+    def test_counters_follow_the_workflow(self):
+        teacher_client = self.as_user(self.teacher)
+        first = teacher_client.post('/api/courses/topics/', {"title": "Тема 1", "description": "Опис", "stream_id": self.stream.id}, format='json').json()
+        teacher_client.post('/api/courses/topics/bulk/', {"stream_id": self.stream.id, "topics": [
+            {"title": "Тема 2", "description": "Опис"},
+            {"title": "Тема 3", "description": "Опис"},
+        ]}, format='json')
+        spare = teacher_client.post('/api/courses/topics/', {"title": "Тема 4", "description": "Опис", "stream_id": self.stream.id}, format='json').json()
+        teacher_client.delete(f'/api/courses/topics/{spare["id"]}/delete/')
+
+        approved, auto_rejected, rejected = (self.submit(student, first["id"]) for student in self.students[:3])
+        cancelled = self.submit(self.students[3], first["id"])
+        self.as_user(self.students[3]).delete(f'/api/courses/submissions/{cancelled["id"]}/')
+
+        teacher_client = self.as_user(self.teacher)
+        teacher_client.post(f'/api/courses/submissions/{rejected["id"]}/reject/')
+        teacher_client.post(f'/api/courses/submissions/{approved["id"]}/approve/')
+
+        self.assertEqual(self.stats(), {
+            "stream": self.stream.id,
+            "available_topics": 2,
+            "taken_topics": 1,
+            "pending_submissions": 0,
+            "approved_submissions": 1,
+            "rejected_submissions": 2,
+        })
+        self.assertEqual(find_drift(), {})
+
+    def test_batch_decisions_update_the_counters(self):
+        topics = self.as_user(self.teacher).post('/api/courses/topics/bulk/', {"stream_id": self.stream.id, "topics": [
+            {"title": f"Тема {index}", "description": "Опис"} for index in range(2)
+        ]}, format='json').json()
+        first, second, third = (self.submit(student, topics[index % 2]["id"]) for index, student in enumerate(self.students[:3]))
+        self.as_user(self.teacher).post('/api/courses/submissions/decide/', {"decisions": [
+            {"id": first["id"], "decision": "approve"},
+            {"id": second["id"], "decision": "reject"},
+        ]}, format='json')
+
+        self.assertEqual(find_drift(), {})
+        self.assertEqual(self.stats()["rejected_submissions"], 2)
+
+    def test_rebuild_command_reports_and_repairs_drift(self):
+        # Writes that bypass the views, like this one, are what the command repairs.
+        Topic.objects.create(title="Тема", description="Опис", teacher=self.teacher, stream=self.stream)
+        self.assertEqual(self.stats()["available_topics"], 0)
+
+        out = io.StringIO()
+        with self.assertRaises(CommandError):
+            call_command("rebuild_stream_stats", "--check", stdout=out)
+        self.assertIn(f"Stream {self.stream.id}: available_topics 0 -> 1", out.getvalue())
+
+        call_command("rebuild_stream_stats", stdout=io.StringIO())
+        call_command("rebuild_stream_stats", "--check", stdout=io.StringIO())
+        self.assertEqual(StreamStats.objects.get(stream=self.stream).available_topics, 1)
+
+    def test_stats_are_limited_to_assigned_teachers_and_staff(self):
+        other_teacher = User.objects.create_user(email="other@test.com", password="password123", first_name="Other", last_name="Teacher", role='TEACHER')
+        admin = User.objects.create_superuser(email="admin@test.com", password="password123", first_name="Admin", last_name="User")
+        url = f'/api/courses/streams/{self.stream.id}/stats/'
+
+        self.assertEqual(self.as_user(self.students[0]).get(url).status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(self.as_user(other_teacher).get(url).status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(self.as_user(admin).get(url).status_code, status.HTTP_200_OK)
+        self.assertEqual(self.as_user(admin).get('/api/courses/streams/999/stats/').status_code, status.HTTP_404_NOT_FOUND)
+
+
+@override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+class TopicSearchTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.teacher = User.objects.create_user(email="teacher@test.com", password="password123", first_name="Test", last_name="Teacher", role='TEACHER')
+        self.student = User.objects.create_user(email="student@test.com", password="password123", first_name="Test", last_name="Student", role='STUDENT')
+        specialty = Specialty.objects.create(code="121", name="Інженерія програмного забезпечення")
+        self.stream = CourseStream.objects.create(name="Потік", specialty=specialty, academic_year="2023-2024", semester=1, course_number=4)
+        self.other_stream = CourseStream.objects.create(name="Інший потік", specialty=specialty, academic_year="2023-2024", semester=1, course_number=4)
+        self.stream.users.add(self.teacher, self.student)
+        self.client.force_authenticate(user=self.student)
+        self.url = f'/api/courses/streams/{self.stream.id}/topics/search/'
+
+    def create_topic(self, title, description="Опис", stream=None):
+        return Topic.objects.create(title=title, description=description, teacher=self.teacher, stream=stream or self.stream)
+
+    def search(self, query):
+        response = self.client.get(self.url, {"q": query})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [topic["title"] for topic in response.json()["results"]]
+
+    def test_stems_match_other_word_forms(self):
+        self.create_topic("Програмування мікроконтролерів")
+        self.create_topic("Аналіз даних", "Застосування методів програмуванням")
+        self.create_topic("Розробка мобільного застосунку")
+
+        self.assertEqual(set(self.search("програмування")), {"Програмування мікроконтролерів", "Аналіз даних"})
+        self.assertEqual(self.search("мобільні застосунки"), ["Розробка мобільного застосунку"])
+        self.assertEqual(self.search("прогр"), ["Програмування мікроконтролерів", "Аналіз даних"])
+
+    def test_title_matches_rank_first(self):
+        self.create_topic("Система керування складом", "Облік товарів")
+        self.create_topic("Облік товарів", "Система керування складом")
+        self.create_topic("Бази даних", "Опис")
+
+        self.assertEqual(self.search("облік"), ["Облік товарів", "Система керування складом"])
+
+    def test_results_are_limited_to_available_topics_of_the_stream(self):
+        self.create_topic("Веб-застосунок для бібліотеки")
+        taken = self.create_topic("Веб-застосунок для кафе")
+        Topic.objects.filter(id=taken.id).update(status='TAKEN')
+        self.create_topic("Веб-застосунок для магазину", stream=self.other_stream)
+
+        self.assertEqual(self.search("веб застосунок"), ["Веб-застосунок для бібліотеки"])
+        self.assertEqual(self.search("   "), [])
+        response = self.client.get(f'/api/courses/streams/{self.other_stream.id}/topics/search/', {"q": "веб"})
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_index_follows_edits_bulk_inserts_and_deletes(self):
+        topic = self.create_topic("Стара назва")
+        Topic.objects.bulk_create([Topic(title="Нейронні мережі", description="Опис", teacher=self.teacher, stream=self.stream)])
+        topic.title = "Нова назва"
+        topic.save()
+
+        self.assertEqual(self.search("назва"), ["Нова назва"])
+        self.assertEqual(self.search("стара"), [])
+        self.assertEqual(self.search("нейронна мережа"), ["Нейронні мережі"])
+        topic.delete()
+        self.assertEqual(self.search("назва"), [])
+
+    def test_migrate_restores_dropped_triggers(self):
+        with connection.cursor() as cursor:
+            cursor.execute("DROP TRIGGER courses_topic_search_insert")
+        emit_post_migrate_signal(0, False, "default")
+        self.create_topic("Нейронні мережі")
+        self.assertEqual(self.search("мережі"), ["Нейронні мережі"])
+
+    def test_backends_must_implement_every_method(self):
+        class FilterOnlyBackend(TopicSearchBackend):
+            def filter(self, queryset, query):
+                return queryset
+
+        with self.assertRaises(TypeError):
+            FilterOnlyBackend()
+
+    def test_fallback_backend_matches_the_same_topics(self):
+        # SQLite only folds ASCII case in LIKE, so the words are lowercase here.
+        self.create_topic("Основи програмування")
+        self.create_topic("Бази даних", "Займемося програмуванням")
+        self.create_topic("Бази знань")
+        topics = Topic.objects.filter(stream=self.stream)
+
+        indexed = SQLiteSearchBackend().search(topics, "програмування", 10)
+        fallback = ContainsSearchBackend().search(topics, "програмування", 10)
+        self.assertEqual({topic.id for topic in indexed}, {topic.id for topic in fallback})
+        self.assertEqual(search_terms("Розробка мобільних застосунків для бібліотеки"), ["розробк", "мобільн", "застосунк", "бібліотек"])
+
+    def test_admin_search_uses_the_index(self):
+        self.create_topic("Програмування мікроконтролерів")
+        self.create_topic("Бази даних")
+        admin = User.objects.create_superuser(email="admin@test.com", password="password123", first_name="Admin", last_name="User")
+        self.client.force_login(admin)
+
+        response = self.client.get("/admin/courses/topic/", {"q": "програмуванні"})
+
+        self.assertContains(response, "Програмування мікроконтролерів")
+        self.assertNotContains(response, "Бази даних")
+
+
+@override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+class AdminChangelistTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(email="admin@test.com", password="password123", first_name="Admin", last_name="User")
+        self.teacher = User.objects.create_user(email="teacher@test.com", password="password123", first_name="Test", last_name="Teacher", role='TEACHER')
+        self.specialty = Specialty.objects.create(code="121", name="Інженерія програмного забезпечення")
+        self.client.force_login(self.admin)
+
+    def create_submissions(self, count):
+        stream = CourseStream.objects.create(name="Потік", specialty=self.specialty, academic_year="2023-2024", semester=1, course_number=4)
+        for _ in range(count):
+            topic = Topic.objects.create(title="Тема", description="Опис", teacher=self.teacher, stream=stream)
+            student = User.objects.create_user(email=f"student{User.objects.count()}@test.com", password="password123", first_name="S", last_name="S", role='STUDENT')
+            stream.users.add(student)
+            TopicSubmission.objects.create(student=student, topic=topic, student_vision="Vision")
+        return stream
+
+    def count_queries(self, url, params=None):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return [query["sql"] for query in context.captured_queries]
+
+    def test_changelist_query_counts_do_not_grow_with_rows(self):
+        urls = ("/admin/courses/topic/", "/admin/courses/topicsubmission/", "/admin/courses/coursestream/")
+        self.create_submissions(1)
+        before = [len(self.count_queries(url)) for url in urls]
+        self.create_submissions(10)
+        self.assertEqual([len(self.count_queries(url)) for url in urls], before)
+
+    def test_stream_search_matches_members_without_duplicates(self):
+        stream = self.create_submissions(5)
+        other_stream = CourseStream.objects.create(name="Інший потік", specialty=self.specialty, academic_year="2023-2024", semester=1, course_number=4)
+
+        queries = self.count_queries("/admin/courses/coursestream/", {"q": "student"})
+        response = self.client.get("/admin/courses/coursestream/", {"q": "student"})
+
+        self.assertEqual(list(response.context["cl"].result_list), [stream])
+        self.assertFalse(any('DISTINCT "courses_coursestream"."id"' in sql for sql in queries))
+        response = self.client.get("/admin/courses/coursestream/", {"q": "Інший"})
+        self.assertEqual(list(response.context["cl"].result_list), [other_stream])
+
+    def test_large_unfiltered_changelists_use_an_estimated_count(self):
+        self.create_submissions(3)
+        with mock.patch("courses.pagination.ESTIMATE_THRESHOLD", 1):
+            unfiltered = self.count_queries("/admin/courses/topicsubmission/")
+            filtered = self.count_queries("/admin/courses/topicsubmission/", {"status__exact": "PENDING"})
+
+        self.assertFalse(any("COUNT(*)" in sql for sql in unfiltered))
+        self.assertEqual(sum("COUNT(*)" in sql for sql in filtered), 1)
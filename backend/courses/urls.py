@@ -1,13 +1,16 @@
-from django.urls import path
+from django.urls import include, path
 from . import views
 
 
 urlpatterns = [
     path("streams/my/", views.get_my_streams, name="my-streams"),
     path("streams/<int:stream_id>/topics/", views.get_stream_topics, name="stream-topics"),
+    path("streams/<int:stream_id>/topics/search/", views.search_stream_topics, name="search-stream-topics"),
+    path("streams/<int:stream_id>/stats/", views.get_stream_stats, name="stream-stats"),
 
     path("topics/my/", views.get_my_topics, name="my-topics"),
     path("topics/", views.create_topic, name="create-topic"),
+    path("topics/bulk/", views.create_topics_bulk, name="create-topics-bulk"),
     path("topics/<int:topic_id>/", views.update_topic, name="update-topic"),
     path("topics/<int:topic_id>/delete/", views.delete_topic, name="delete-topic"),
 
@@ -16,5 +19,8 @@ urlpatterns = [
     path("submissions/<int:submission_id>/", views.cancel_submission, name="cancel-submission"),
     path("submissions/received/", views.get_received_submissions, name="received-submissions"),
     path("submissions/<int:submission_id>/approve/", views.approve_submission, name="approve-submission"),
-    path("submissions/<int:submission_id>/reject/", views.reject_submission, name="reject-submission")
+    path("submissions/<int:submission_id>/reject/", views.reject_submission, name="reject-submission"),
+    path("submissions/decide/", views.decide_submissions, name="decide-submissions"),
+
+    path("async/", include("courses.async_urls"))
 ]
\ No newline at end of file
@@ -1,13 +1,25 @@
-from django.db import transaction
-from django.db.models import Max, Prefetch
+from collections import Counter, defaultdict
+from django.db import IntegrityError, transaction
+from django.db.models import Count
 from django.shortcuts import get_object_or_404
 from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from .models import CourseStream, Topic, TopicSubmission
+from users.models import User
+from .models import CourseStream, StreamStats, Topic, TopicSubmission
+from . import queries
+from .caching import bump_stream_version, cached_stream_topics_response
+from .events import issue_ticket, publish_topic_event
+from .fast_serialization import serialize_many
+from .fieldsets import fieldset_from_request, narrow_queryset
+from .importers import create_topics
+from .membership import is_member
+from .pagination import KeysetPagination, paginated_response
 from .permissions import IsStudent, IsTeacher
-from .serializers import MyStreamSerializer, TopicSerializer, TopicSubmissionSerializer, TopicSubmissionCreateSerializer, TopicCreateSerializer, TopicWithSubmissionsSerializer
+from .search import search_topics
+from .stats import SUBMISSION_FIELDS, TOPIC_FIELDS, adjust_many, adjust_stream_stats, rebuild_stream_stats
+from .serializers import MyStreamSerializer, TopicSerializer, TopicSubmissionSerializer, TopicSubmissionCreateSerializer, TopicCreateSerializer, TopicWithSubmissionsSerializer, SubmissionDecisionsSerializer, TopicBulkCreateSerializer, StreamStatsSerializer
 
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
@@ -15,30 +27,74 @@ def get_my_streams(request):
     is_active_param = request.query_params.get('is_active', 'true').lower()
     is_active = is_active_param == 'true'
     
-    streams = request.user.streams.filter(is_active=is_active)
-    serializer = MyStreamSerializer(streams, many=True)
-    return Response(serializer.data)
+    streams = queries.my_streams(request.user, is_active)
+    return paginated_response(request, streams, MyStreamSerializer, ('id',))
 
 @api_view(["GET"])
 @permission_classes([IsAuthenticated, IsStudent])
 def get_stream_topics(request, stream_id):
-    stream = get_object_or_404(CourseStream, id=stream_id)
-    if request.user not in stream.users.all():
+    if not is_member(request.user, stream_id):
+        get_object_or_404(CourseStream, id=stream_id)
         return Response(
             {"detail": "Not authorized to view topics for this stream."},
             status=status.HTTP_403_FORBIDDEN,
         )
 
-    topics = Topic.objects.filter(stream=stream, status=Topic.TopicStatus.AVAILABLE)
-    serializer = TopicSerializer(topics, many=True)
-    return Response(serializer.data)
+    def render_topics():
+        return paginated_response(request, queries.available_topics(stream_id), TopicSerializer, ('id',)).data
+
+    return cached_stream_topics_response(request, stream_id, render_topics)
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated, IsStudent])
+def search_stream_topics(request, stream_id):
+    if not is_member(request.user, stream_id):
+        get_object_or_404(CourseStream, id=stream_id)
+        return Response(
+            {"detail": "Not authorized to view topics for this stream."},
+            status=status.HTTP_403_FORBIDDEN,
+        )
+
+    fieldset = fieldset_from_request(request, TopicSerializer)
+    topics = narrow_queryset(queries.available_topics(stream_id), TopicSerializer, fieldset, ('id',))
+    limit = KeysetPagination(('id',)).get_page_size(request)
+    results = search_topics(topics, request.query_params.get('q', ''), limit, stream_id)
+    return Response({"results": serialize_many(TopicSerializer, results, fieldset)})
+
+@api_view(["POST"])
+@permission_classes([IsAuthenticated, IsStudent])
+def issue_stream_events_ticket(request, stream_id):
+    if not is_member(request.user, stream_id):
+        get_object_or_404(CourseStream, id=stream_id)
+        return Response(
+            {"detail": "Not authorized to view topics for this stream."},
+            status=status.HTTP_403_FORBIDDEN,
+        )
+
+    return Response({"ticket": issue_ticket(request.user, stream_id)})
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def get_stream_stats(request, stream_id):
+    is_assigned_teacher = request.user.role == User.Role.TEACHER and is_member(request.user, stream_id)
+    if not (request.user.is_staff or is_assigned_teacher):
+        get_object_or_404(CourseStream, id=stream_id)
+        return Response(
+            {"detail": "Not authorized to view stats for this stream."},
+            status=status.HTTP_403_FORBIDDEN,
+        )
+
+    stats = StreamStats.objects.filter(stream_id=stream_id).first()
+    if stats is None:
+        get_object_or_404(CourseStream, id=stream_id)
+        rebuild_stream_stats([stream_id])
+        stats = StreamStats.objects.get(stream_id=stream_id)
+    return Response(StreamStatsSerializer(stats).data)
 
 @api_view(["GET"])
 @permission_classes([IsAuthenticated, IsStudent])
 def get_my_submissions(request):
-    submissions = request.user.submissions.order_by('-created_at')
-    serializer = TopicSubmissionSerializer(submissions, many=True)
-    return Response(serializer.data)
+    return paginated_response(request, queries.my_submissions(request.user), TopicSubmissionSerializer, ('-created_at', '-id'))
 
 @api_view(["POST"])
 @permission_classes([IsAuthenticated, IsStudent])
@@ -51,32 +107,31 @@ def create_submission(request):
         if not student_vision or not student_vision.strip():
             return Response({"detail": "The 'student_vision' field cannot be empty"}, status=status.HTTP_400_BAD_REQUEST)
 
-        topic = get_object_or_404(Topic, id=topic_id)
-        
-        if topic.status != Topic.TopicStatus.AVAILABLE:
-            return Response({"detail": "Topic is not available"}, status=status.HTTP_400_BAD_REQUEST)
-
-        student = request.user
-
-        existing_submissions = TopicSubmission.objects.filter(
-            student=student,
-            topic__stream=topic.stream,
-            status__in=[TopicSubmission.SubmissionStatus.PENDING, TopicSubmission.SubmissionStatus.APPROVED],
-        ).exists()
+        topics = Topic.objects.select_related('teacher', 'stream__specialty').select_for_update(of=('self',))
+
+        with transaction.atomic():
+            topic = get_object_or_404(topics, id=topic_id)
+
+            if topic.status != Topic.TopicStatus.AVAILABLE:
+                return Response({"detail": "Topic is not available"}, status=status.HTTP_400_BAD_REQUEST)
+
+            try:
+                with transaction.atomic():
+                    submission = TopicSubmission.objects.create(
+                        student=request.user,
+                        topic=topic,
+                        stream=topic.stream,
+                        student_vision=student_vision
+                    )
+                    adjust_stream_stats(topic.stream_id, pending_submissions=1)
+            except IntegrityError:
+                return Response(
+                    {
+                        "detail": "You already have a pending or approved submission in this stream."
+                    },
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
 
-        if existing_submissions:
-            return Response(
-                {
-                    "detail": "You already have a pending or approved submission in this stream."
-                },
-                status=status.HTTP_400_BAD_REQUEST,
-            )
-
-        submission = TopicSubmission.objects.create(
-            student=student, 
-            topic=topic,
-            student_vision=student_vision
-        )
         response_serializer = TopicSubmissionSerializer(submission)
         return Response(response_serializer.data, status=status.HTTP_201_CREATED)
 
@@ -88,12 +143,17 @@ def cancel_submission(request, submission_id):
     submission = get_object_or_404(
         TopicSubmission, id=submission_id, student=request.user
     )
-    if submission.status != TopicSubmission.SubmissionStatus.PENDING:
+    with transaction.atomic():
+        deleted_count, _ = TopicSubmission.objects.filter(
+            id=submission.id, status=TopicSubmission.SubmissionStatus.PENDING
+        ).delete()
+        if deleted_count:
+            adjust_stream_stats(submission.stream_id, pending_submissions=-1)
+    if not deleted_count:
         return Response(
             {"detail": "Only PENDING submissions can be canceled."},
             status=status.HTTP_400_BAD_REQUEST,
         )
-    submission.delete()
     return Response(status=status.HTTP_204_NO_CONTENT)
 
 @api_view(["GET"])
@@ -102,9 +162,8 @@ def get_my_topics(request):
     is_active_param = request.query_params.get('is_active', 'true').lower()
     is_active = is_active_param == 'true'
 
-    topics = request.user.topics.filter(stream__is_active=is_active)
-    serializer = TopicSerializer(topics, many=True)
-    return Response(serializer.data)
+    topics = queries.my_topics(request.user, is_active)
+    return paginated_response(request, topics, TopicSerializer, ('id',))
 
 @api_view(["POST"])
 @permission_classes([IsAuthenticated, IsTeacher])
@@ -115,30 +174,73 @@ def create_topic(request):
         stream = get_object_or_404(CourseStream, id=stream_id)
         teacher = request.user
 
-        if teacher not in stream.users.all():
+        if not is_member(teacher, stream):
             return Response(
                 {"detail": "You are not assigned to this stream."},
                 status=status.HTTP_403_FORBIDDEN,
             )
 
-        topic = Topic.objects.create(
-            teacher=teacher,
-            stream=stream,
-            title=serializer.validated_data["title"],
-            description=serializer.validated_data["description"],
-        )
+        with transaction.atomic():
+            topic = Topic.objects.create(
+                teacher=teacher,
+                stream=stream,
+                title=serializer.validated_data["title"],
+                description=serializer.validated_data["description"],
+            )
+            adjust_stream_stats(stream.id, available_topics=1)
         response_serializer = TopicSerializer(topic)
+        publish_topic_event(stream.id, "topic.created", response_serializer.data)
         return Response(response_serializer.data, status=status.HTTP_201_CREATED)
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+@api_view(["POST"])
+@permission_classes([IsAuthenticated, IsTeacher])
+def create_topics_bulk(request):
+    serializer = TopicBulkCreateSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    stream_id = serializer.validated_data["stream_id"]
+    if not is_member(request.user, stream_id):
+        get_object_or_404(CourseStream, id=stream_id)
+        return Response(
+            {"detail": "You are not assigned to this stream."},
+            status=status.HTTP_403_FORBIDDEN,
+        )
+
+    stream = get_object_or_404(CourseStream.objects.select_related('specialty'), id=stream_id)
+    with transaction.atomic():
+        topics = create_topics(request.user, stream, serializer.validated_data["topics"])
+    return Response(serialize_many(TopicSerializer, topics), status=status.HTTP_201_CREATED)
+
 @api_view(["PUT"])
 @permission_classes([IsAuthenticated, IsTeacher])
 def update_topic(request, topic_id):
     topic = get_object_or_404(Topic, id=topic_id, teacher=request.user)
     serializer = TopicCreateSerializer(topic, data=request.data, partial=True)
+    previous_stream_id = topic.stream_id
     if serializer.is_valid():
-        serializer.save()
+        try:
+            with transaction.atomic():
+                topic = serializer.save()
+                if topic.stream_id != previous_stream_id:
+                    topic.submissions.update(stream_id=topic.stream_id)
+                    moved = Counter({TOPIC_FIELDS[topic.status]: 1})
+                    for submission_status, count in topic.submissions.order_by().values_list('status').annotate(count=Count('id')):
+                        moved[SUBMISSION_FIELDS[submission_status]] += count
+                    adjust_stream_stats(previous_stream_id, **{name: -count for name, count in moved.items()})
+                    adjust_stream_stats(topic.stream_id, **moved)
+                    bump_stream_version(previous_stream_id)
+                    publish_topic_event(previous_stream_id, "topic.deleted", {"id": topic.id})
+        except IntegrityError:
+            return Response(
+                {
+                    "detail": "A student with an active submission for this topic already has one in the target stream."
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
         response_serializer = TopicSerializer(topic)
+        publish_topic_event(topic.stream_id, "topic.updated", response_serializer.data)
         return Response(response_serializer.data)
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -151,34 +253,25 @@ def delete_topic(request, topic_id):
             {"detail": "Cannot delete a topic that has submissions."},
             status=status.HTTP_400_BAD_REQUEST,
         )
-    topic.delete()
+    stream_id = topic.stream_id
+    with transaction.atomic():
+        topic.delete()
+        adjust_stream_stats(stream_id, **{TOPIC_FIELDS[topic.status]: -1})
+    publish_topic_event(stream_id, "topic.deleted", {"id": topic_id})
     return Response(status=status.HTTP_204_NO_CONTENT)
 
 @api_view(["GET"])
 @permission_classes([IsAuthenticated, IsTeacher])
 def get_received_submissions(request):
-    prefetch_submissions = Prefetch(
-        'submissions',
-        queryset=TopicSubmission.objects.order_by('-created_at').select_related('student'),
-    )
-
-    topics_with_submissions = Topic.objects.filter(
-        teacher=request.user,
-        submissions__isnull=False
-    ).annotate(
-        latest_submission_date=Max('submissions__created_at')
-    ).distinct().prefetch_related(
-        prefetch_submissions
-    ).order_by('-latest_submission_date')
-
-    serializer = TopicWithSubmissionsSerializer(topics_with_submissions, many=True)
-    return Response(serializer.data)
+    return paginated_response(request, queries.received_submissions(request.user), TopicWithSubmissionsSerializer, ('-latest_submission_date', '-id'))
 
 @api_view(["POST"])
 @permission_classes([IsAuthenticated, IsTeacher])
 def approve_submission(request, submission_id):
     submission = get_object_or_404(
-        TopicSubmission, id=submission_id, topic__teacher=request.user
+        TopicSubmission.objects.select_related('student', 'topic__teacher', 'topic__stream__specialty'),
+        id=submission_id,
+        topic__teacher=request.user,
     )
     if submission.status != TopicSubmission.SubmissionStatus.PENDING:
         return Response(
@@ -189,16 +282,41 @@ def approve_submission(request, submission_id):
     topic = submission.topic
 
     with transaction.atomic():
-        submission.status = TopicSubmission.SubmissionStatus.APPROVED
-        submission.save()
-
-        topic.status = Topic.TopicStatus.TAKEN
-        topic.save()
+        claimed = Topic.objects.filter(
+            id=topic.id, status=Topic.TopicStatus.AVAILABLE
+        ).update(status=Topic.TopicStatus.TAKEN)
+        if not claimed:
+            return Response(
+                {"detail": "This topic has already been taken."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        bump_stream_version(topic.stream_id)
+        publish_topic_event(topic.stream_id, "topic.status", {"id": topic.id, "status": Topic.TopicStatus.TAKEN})
+
+        approved = TopicSubmission.objects.filter(
+            id=submission.id, status=TopicSubmission.SubmissionStatus.PENDING
+        ).update(status=TopicSubmission.SubmissionStatus.APPROVED)
+        if not approved:
+            transaction.set_rollback(True)
+            return Response(
+                {"detail": "This submission is not pending approval."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
 
-        TopicSubmission.objects.filter(
+        auto_rejected = TopicSubmission.objects.filter(
             topic=topic, status=TopicSubmission.SubmissionStatus.PENDING
         ).update(status=TopicSubmission.SubmissionStatus.REJECTED)
+        adjust_stream_stats(
+            topic.stream_id,
+            available_topics=-1,
+            taken_topics=1,
+            pending_submissions=-1 - auto_rejected,
+            approved_submissions=1,
+            rejected_submissions=auto_rejected,
+        )
 
+    submission.status = TopicSubmission.SubmissionStatus.APPROVED
+    topic.status = Topic.TopicStatus.TAKEN
     serializer = TopicSubmissionSerializer(submission)
     return Response(serializer.data)
 
@@ -206,16 +324,98 @@ def approve_submission(request, submission_id):
 @permission_classes([IsAuthenticated, IsTeacher])
 def reject_submission(request, submission_id):
     submission = get_object_or_404(
-        TopicSubmission, id=submission_id, topic__teacher=request.user
+        TopicSubmission.objects.select_related('student', 'topic__teacher', 'topic__stream__specialty'),
+        id=submission_id,
+        topic__teacher=request.user,
     )
 
-    if submission.status != TopicSubmission.SubmissionStatus.PENDING:
+    with transaction.atomic():
+        rejected = TopicSubmission.objects.filter(
+            id=submission.id, status=TopicSubmission.SubmissionStatus.PENDING
+        ).update(status=TopicSubmission.SubmissionStatus.REJECTED)
+        if rejected:
+            adjust_stream_stats(submission.stream_id, pending_submissions=-1, rejected_submissions=1)
+    if not rejected:
         return Response(
             {"detail": "This submission is not pending rejection."},
             status=status.HTTP_400_BAD_REQUEST,
         )
 
     submission.status = TopicSubmission.SubmissionStatus.REJECTED
-    submission.save()
     serializer = TopicSubmissionSerializer(submission)
-    return Response(serializer.data)
\ No newline at end of file
+    return Response(serializer.data)
+
+@api_view(["POST"])
+@permission_classes([IsAuthenticated, IsTeacher])
+def decide_submissions(request):
+    serializer = SubmissionDecisionsSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    SubmissionStatus = TopicSubmission.SubmissionStatus
+    decisions = {item["id"]: item["decision"] for item in serializer.validated_data["decisions"]}
+    approved, rejected, failed = [], [], []
+    approvals = {}
+    auto_rejected = 0
+    deltas = defaultdict(Counter)
+
+    with transaction.atomic():
+        submissions = {
+            submission_id: (topic_id, stream_id, submission_status)
+            for submission_id, topic_id, stream_id, submission_status in TopicSubmission.objects.select_for_update(of=('self',)).filter(
+                id__in=decisions, topic__teacher=request.user
+            ).values_list('id', 'topic_id', 'stream_id', 'status')
+        }
+
+        for submission_id, decision in decisions.items():
+            if submission_id not in submissions:
+                failed.append({"id": submission_id, "detail": "Not found."})
+                continue
+            topic_id, _, submission_status = submissions[submission_id]
+            if submission_status != SubmissionStatus.PENDING:
+                failed.append({"id": submission_id, "detail": f"This submission is not pending {'approval' if decision == 'approve' else 'rejection'}."})
+            elif decision == "reject":
+                rejected.append(submission_id)
+            elif topic_id in approvals:
+                failed.append({"id": submission_id, "detail": "Another submission for this topic is approved in this request."})
+            else:
+                approvals[topic_id] = submission_id
+
+        if rejected:
+            TopicSubmission.objects.filter(id__in=rejected).update(status=SubmissionStatus.REJECTED)
+            for submission_id in rejected:
+                deltas[submissions[submission_id][1]].update(pending_submissions=-1, rejected_submissions=1)
+
+        if approvals:
+            claimable = set(Topic.objects.select_for_update().filter(
+                id__in=approvals, status=Topic.TopicStatus.AVAILABLE
+            ).values_list('id', flat=True))
+            for topic_id, submission_id in approvals.items():
+                if topic_id in claimable:
+                    approved.append(submission_id)
+                else:
+                    failed.append({"id": submission_id, "detail": "This topic has already been taken."})
+
+        if approved:
+            Topic.objects.filter(id__in=claimable).update(status=Topic.TopicStatus.TAKEN)
+            TopicSubmission.objects.filter(id__in=approved).update(status=SubmissionStatus.APPROVED)
+            auto_rejected_rows = TopicSubmission.objects.filter(topic_id__in=claimable, status=SubmissionStatus.PENDING)
+            for stream_id, count in auto_rejected_rows.order_by().values_list('stream_id').annotate(count=Count('id')):
+                deltas[stream_id].update(pending_submissions=-count, rejected_submissions=count)
+            auto_rejected = auto_rejected_rows.update(status=SubmissionStatus.REJECTED)
+
+            for submission_id in approved:
+                topic_id, stream_id, _ = submissions[submission_id]
+                deltas[stream_id].update(available_topics=-1, taken_topics=1, pending_submissions=-1, approved_submissions=1)
+                publish_topic_event(stream_id, "topic.status", {"id": topic_id, "status": Topic.TopicStatus.TAKEN})
+            for stream_id in {submissions[submission_id][1] for submission_id in approved}:
+                bump_stream_version(stream_id)
+
+        adjust_many(deltas)
+
+    return Response({
+        "approved": approved,
+        "rejected": rejected,
+        "auto_rejected": auto_rejected,
+        "failed": failed,
+    })
@@ -0,0 +1,29 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework.authentication import TokenAuthentication
+import hashlib
+
+
+def _cache_key(key):
+    return f"users:token:{hashlib.sha256(key.encode('utf-8')).hexdigest()}"
+
+
+def _delete_cached_tokens(keys):
+    cache.delete_many([_cache_key(key) for key in keys])
+
+
+def invalidate_tokens(keys):
+    keys = list(keys)
+    _delete_cached_tokens(keys)
+    transaction.on_commit(lambda: _delete_cached_tokens(keys))
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    def authenticate_credentials(self, key):
+        cache_key = _cache_key(key)
+        credentials = cache.get(cache_key)
+        if credentials is None:
+            credentials = super().authenticate_credentials(key)
+            cache.set(cache_key, credentials, settings.AUTH_TOKEN_CACHE_TIMEOUT)
+        return credentials
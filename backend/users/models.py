@@ -1,8 +1,38 @@
+from collections import defaultdict
 from django.contrib.auth.models import AbstractUser, BaseUserManager
 from django.db import models
+from django.db.models import Q
 
 
 class CustomUserManager(BaseUserManager):
+    USERNAME_LOOKUP_BATCH_SIZE = 200
+
+    def allocate_usernames(self, emails):
+        username_bases = [email.split("@")[0] for email in emails]
+        unique_bases = list(dict.fromkeys(username_bases))
+        # Full usernames, because one base's suffixed name ("a" -> "a_1") can be another base ("a_1") in the same batch.
+        taken = set()
+
+        for start in range(0, len(unique_bases), self.USERNAME_LOOKUP_BATCH_SIZE):
+            batch = unique_bases[start:start + self.USERNAME_LOOKUP_BATCH_SIZE]
+            query = Q()
+            for username_base in batch:
+                query |= Q(username=username_base) | Q(username__gt=f"{username_base}_", username__lt=f"{username_base}`")
+            taken.update(self.filter(query).values_list("username", flat=True))
+
+        next_counters = defaultdict(int)
+        usernames = []
+        for username_base in username_bases:
+            counter = next_counters[username_base]
+            username = f"{username_base}_{counter}" if counter else username_base
+            while username in taken:
+                counter += 1
+                username = f"{username_base}_{counter}"
+            next_counters[username_base] = counter + 1
+            taken.add(username)
+            usernames.append(username)
+        return usernames
+
     def _create_user(self, email, password, **extra_fields):
         if not email:
             raise ValueError("The given email must be set")
@@ -52,13 +82,7 @@ class User(AbstractUser):
 
     def save(self, *args, **kwargs):
         if not self.username:
-            username_base = self.email.split("@")[0]
-            username = username_base
-            counter = 1
-            while User.objects.filter(username=username).exists():
-                username = f"{username_base}_{counter}"
-                counter += 1
-            self.username = username
+            self.username = User.objects.allocate_usernames([self.email])[0]
         super().save(*args, **kwargs)
 
     def __str__(self):
@@ -1 +1,75 @@
-from django.test import TestCase
\ No newline at end of file
+from django.test import TestCase, override_settings
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from .models import User
+
+
+class UsernameAllocationTests(TestCase):
+    def create_user(self, email):
+        return User.objects.create_user(email=email, password="password123", first_name="Test", last_name="User", middle_name="M")
+
+    def test_username_is_derived_from_email(self):
+        self.assertEqual(self.create_user("student@test.com").username, "student")
+
+    def test_colliding_usernames_get_the_next_free_suffix(self):
+        self.create_user("student@test.com")
+        self.assertEqual(self.create_user("student@other.com").username, "student_1")
+        self.assertEqual(self.create_user("student@third.com").username, "student_2")
+
+    def test_gaps_and_unrelated_usernames_are_respected(self):
+        self.create_user("student@test.com")
+        User.objects.create_user(email="x@test.com", username="student_2", password="password123")
+        User.objects.create_user(email="y@test.com", username="student_abc", password="password123")
+        User.objects.create_user(email="z@test.com", username="students", password="password123")
+        self.assertEqual(User.objects.allocate_usernames(["student@a.com", "student@b.com", "student@c.com"]), ["student_1", "student_3", "student_4"])
+
+    def test_suffixed_names_do_not_collide_with_other_bases(self):
+        self.create_user("a@x.com")
+        self.assertEqual(User.objects.allocate_usernames(["a@y.com", "a_1@z.com"]), ["a_1", "a_1_1"])
+        self.assertEqual(User.objects.allocate_usernames(["a_1@z.com", "a@y.com", "a@w.com"]), ["a_1", "a_2", "a_3"])
+
+    def test_batch_allocation_uses_a_single_query(self):
+        self.create_user("student@test.com")
+        self.create_user("teacher@test.com")
+        emails = ["student@a.com", "teacher@a.com", "student@b.com", "new@a.com"]
+        with self.assertNumQueries(1):
+            usernames = User.objects.allocate_usernames(emails)
+        self.assertEqual(usernames, ["student_1", "teacher_1", "student_2", "new"])
+
+
+@override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+class CachedTokenAuthenticationTests(TestCase):
+    url = "/api/auth/user/"
+
+    def setUp(self):
+        self.user = User.objects.create_user(email="student@test.com", password="password123", first_name="Student", last_name="One", middle_name="M", role="STUDENT")
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+
+    def test_token_lookup_is_cached(self):
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_200_OK)
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url)
+        self.assertEqual(response.data["email"], "student@test.com")
+
+    def test_logout_invalidates_cached_token(self):
+        self.client.get(self.url)
+        self.assertEqual(self.client.post("/api/auth/logout/").status_code, status.HTTP_200_OK)
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deactivation_invalidates_cached_token(self):
+        self.client.get(self.url)
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_password_change_refreshes_cached_user(self):
+        self.client.get(self.url)
+        response = self.client.post("/api/auth/password/change/", {"new_password1": "N3w-secret-pass", "new_password2": "N3w-secret-pass"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.check_password("N3w-secret-pass"))
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get(self.url).status_code, status.HTTP_200_OK)
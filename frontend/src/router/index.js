@@ -1,6 +1,7 @@
 import { createRouter, createWebHistory } from 'vue-router';
 import LoginView from '../views/LoginView.vue';
 import ChangePasswordView from '../views/ChangePasswordView.vue';
+import SetPasswordView from '../views/SetPasswordView.vue';
 import MyStreamsView from '../views/MyStreamsView.vue';
 import StreamTopicsView from '../views/StreamTopicsView.vue';
 import MyTopicsView from '../views/MyTopicsView.vue';
@@ -34,6 +35,11 @@ const routes = [
     component: ChangePasswordView,
     meta: { requiresAuth: true },
   },
+  {
+    path: '/set-password/:uid/:token',
+    name: 'set-password',
+    component: SetPasswordView,
+  },
   {
     path: '/my-streams',
     name: 'my-streams',
@@ -10,4 +10,7 @@ export default {
   changePassword(passwords) {
     return api.post('/auth/password/change/', passwords);
   },
+  confirmPasswordReset(data) {
+    return api.post('/auth/password/reset/confirm/', data);
+  },
 };
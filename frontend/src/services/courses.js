@@ -1,22 +1,66 @@
 import api from './api';
 
+// Read endpoints have async twins for ASGI deployments (VITE_ASYNC_READS=true); only those serve live topic events.
+export const asyncReads = import.meta.env.VITE_ASYNC_READS === 'true';
+const readBase = asyncReads ? '/courses/async' : '/courses';
+
+const cursorFromUrl = (url) => (url ? new URL(url, window.location.origin).searchParams.get('cursor') : null);
+
+const getPage = async (url, params = {}) => {
+  const response = await api.get(url, { params });
+  return {
+    results: response.data.results,
+    nextCursor: cursorFromUrl(response.data.next),
+  };
+};
+
+export const fetchAllPages = async (fetchPage) => {
+  const results = [];
+  let cursor = null;
+  do {
+    const page = await fetchPage(cursor);
+    results.push(...page.results);
+    cursor = page.nextCursor;
+  } while (cursor);
+  return results;
+};
+
 export default {
-  getMyStreams(isActive = true) {
-    return api.get('/courses/streams/my/', { params: { is_active: isActive } });
+  getMyStreams(isActive = true, cursor = null) {
+    return getPage(`${readBase}/streams/my/`, { is_active: isActive, cursor });
   },
   
-  getStreamTopics(streamId) {
-    return api.get(`/courses/streams/${streamId}/topics/`);
+  getStreamTopics(streamId, cursor = null) {
+    return getPage(`${readBase}/streams/${streamId}/topics/`, { cursor });
+  },
+
+  searchStreamTopics(streamId, query) {
+    return api.get(`/courses/streams/${streamId}/topics/search/`, { params: { q: query } });
+  },
+
+  async subscribeToStreamTopics(streamId) {
+    // EventSource cannot send the auth header, so the stream is opened with a short-lived signed ticket.
+    const response = await api.post(`/courses/streams/${streamId}/events/ticket/`);
+    const ticket = encodeURIComponent(response.data.ticket);
+    return new EventSource(`/api/courses/streams/${streamId}/events/?ticket=${ticket}`);
+  },
+
+  getStreamStats(streamId) {
+    return api.get(`/courses/streams/${streamId}/stats/`);
   },
 
-  getMyTopics(isActive = true) {
-    return api.get('/courses/topics/my/', { params: { is_active: isActive } });
+  getMyTopics(isActive = true, cursor = null) {
+    return getPage(`${readBase}/topics/my/`, { is_active: isActive, cursor });
   },
 
   createTopic(topicData) {
     return api.post('/courses/topics/', topicData);
   },
 
+  createTopics(streamId, topics) {
+    return api.post('/courses/topics/bulk/', { stream_id: streamId, topics });
+  },
+
   updateTopic(topicId, topicData) {
     return api.put(`/courses/topics/${topicId}/`, topicData);
   },
@@ -25,8 +69,8 @@ export default {
     return api.delete(`/courses/topics/${topicId}/delete/`);
   },
 
-  getMySubmissions() {
-    return api.get('/courses/submissions/my/');
+  getMySubmissions(cursor = null) {
+    return getPage(`${readBase}/submissions/my/`, { cursor });
   },
 
   createSubmission(submissionData) {
@@ -37,8 +81,8 @@ export default {
     return api.patch(`/courses/submissions/${submissionId}/`);
   },
 
-  getReceivedSubmissions() {
-    return api.get('/courses/submissions/received/');
+  getReceivedSubmissions(cursor = null) {
+    return getPage(`${readBase}/submissions/received/`, { cursor });
   },
 
   approveSubmission(submissionId) {
@@ -47,5 +91,9 @@ export default {
 
   rejectSubmission(submissionId) {
     return api.post(`/courses/submissions/${submissionId}/reject/`);
+  },
+
+  decideSubmissions(decisions) {
+    return api.post('/courses/submissions/decide/', { decisions });
   }
 };
\ No newline at end of file